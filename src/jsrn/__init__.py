@@ -3,15 +3,17 @@ __author_email__ = "tim.savage@poweredbypenguins.org"
 __copyright__ = "Copyright (C) 2013 Tim Savage"
 __version__ = "0.3.2"
 
-try:
-    import simplejson as json
-except ImportError:
-    import json
 from jsrn.resources import Resource
 from jsrn.fields import *
 from jsrn.fields.composite import *
 
 
+def _get_resource_name(resource):
+    if isinstance(resource, type) and issubclass(resource, Resource):
+        return resource._meta.resource_name
+    return resource
+
+
 def load(fp, *args, **kwargs):
     """
     Load a from a JSON encoded file.
@@ -21,7 +23,30 @@ def load(fp, *args, **kwargs):
     return loads(fp.read(), *args, **kwargs)
 
 
-def loads(s, resource=None):
+def load_path(path, resource=None, trusted=False, lazy=False, only=None, fail_fast=False, mmap=True):
+    """
+    Load from a JSON encoded file given its path.
+
+    With ``mmap`` the file is memory mapped and parsed directly from the mapping rather than being read into a string
+    (see ``jsrn.backends.load_file``); with a JSON backend that parses from a buffer (eg orjson) peak memory use is
+    that of the decoded document rather than the decoded document plus its text. Use ``lazy`` to also defer
+    conversion of field values or ``iterload`` to decode an array a resource at a time.
+
+    See ``loads`` for a complete explanation of other parameters.
+
+    :param path: Path of the file to load.
+    :param mmap: Memory map the file rather than reading it.
+    """
+    from jsrn import backends
+    from jsrn.encoding import build_object_graph
+    from jsrn.exceptions import FailFastErrors
+    with open(path, 'rb') as fp:
+        obj = backends.load_file(fp, mmap)
+    errors = FailFastErrors() if fail_fast and not (trusted or lazy) else None
+    return build_object_graph(obj, _get_resource_name(resource), trusted, lazy, only, errors)
+
+
+def loads(s, resource=None, trusted=False, lazy=False, only=None, fail_fast=False):
     """
     Load from a JSON encoded string.
 
@@ -32,13 +57,190 @@ def loads(s, resource=None):
 
     :param s: String to load and parse.
     :param resource: A resource instance or a resource name to use as the base for creating a resource.
+    :param trusted: The document is from a trusted source (eg data previously dumped by JSRN), values are converted to
+        the expected types but no validation is performed.
+    :param lazy: Fields of the root resource(s) are converted and validated when first accessed rather than when
+        loaded; ``full_clean`` forces all fields to be validated.
+    :param only: Only decode the fields selected by a list of attribute names, dotted paths select fields of child
+        resources eg ``['id', 'owner.name']``. Other fields are set to ``None`` and are not validated. A
+        ``ValueError`` is raised for names that are not fields.
+    :param fail_fast: Stop validating at the first error; the ``ValidationError`` raised only contains that error, its
+        path is available from the ``path`` attribute of the error. Ignored for trusted or lazy loading.
     """
+    from jsrn import backends
     from jsrn.encoding import build_object_graph
-    if isinstance(resource, type) and issubclass(resource, Resource):
-        resource_name = resource._meta.resource_name
+    from jsrn.exceptions import FailFastErrors
+    errors = FailFastErrors() if fail_fast and not (trusted or lazy) else None
+    return build_object_graph(backends.loads(s), _get_resource_name(resource), trusted, lazy, only, errors)
+
+
+def loadb(data, resource=None, trusted=False, lazy=False, only=None, fail_fast=False):
+    """
+    Load from a UTF-8 encoded JSON document supplied as ``bytes``, ``bytearray`` or ``memoryview`` (eg the body of a
+    HTTP request) without first decoding it into a string.
+
+    See ``loads`` for a complete explanation of other parameters.
+
+    :param data: Bytes to load and parse.
+    """
+    from jsrn import backends
+    from jsrn.encoding import build_object_graph
+    from jsrn.exceptions import FailFastErrors
+    errors = FailFastErrors() if fail_fast and not (trusted or lazy) else None
+    return build_object_graph(backends.loadb(data), _get_resource_name(resource), trusted, lazy, only, errors)
+
+
+def validate(s, resource=None, only=None):
+    """
+    Load and validate a JSON encoded string without raising a ``ValidationError``.
+
+    Errors are accumulated as the document is decoded (fields record errors rather than raising exceptions) and are
+    returned in a result object. Resources are always decoded eagerly (lazy decoding would defer validation). See
+    ``loads`` for a complete explanation of other parameters.
+
+    :param s: String to load and parse.
+    :returns: ``ValidationResult`` with ``is_valid``, ``errors`` (empty if valid) and ``value`` (the loaded
+        resource(s) or ``None`` if not valid).
+    """
+    from jsrn import backends
+    from jsrn.encoding import build_object_graph
+    from jsrn.exceptions import ValidationResult
+    errors = {}
+    value = build_object_graph(backends.loads(s), _get_resource_name(resource), only=only, errors=errors)
+    return ValidationResult(None if errors else value, errors)
+
+
+def iterload(fp, resource=None, path=None, trusted=False, lazy=False, only=None, chunk_size=None):
+    """
+    Iterate resources from a JSON encoded file containing an array, the file is parsed incrementally so only a single
+    resource is held in memory at any time.
+
+    The array can either be the root of the document or nested within objects by supplying a ``path``. If a
+    ``resource`` is also supplied this is the type of the root object and the path is a dotted path of attribute names
+    that ends in an ``ArrayOf`` field eg ``Library`` with the path ``books``. Otherwise ``resource`` is the type of each
+    element and the path is a dotted path of keys in the document.
+
+    See ``loads`` for a complete explanation of other parameters. A ``ValidationError`` raised for an element contains
+    the index of that element.
+
+    :param fp: File pointer to read JSON from.
+    :param resource: A resource type or resource name (see above).
+    :param path: Path to an array within the document.
+    :param chunk_size: Size of chunks read from the file.
+    """
+    from jsrn.encoding import build_object_graph
+    from jsrn.exceptions import ValidationError
+    from jsrn.streaming import iter_array, DEFAULT_CHUNK_SIZE
+
+    keys = None
+    if path:
+        keys = path.split('.')
+        if isinstance(resource, type) and issubclass(resource, Resource):
+            for idx, attname in enumerate(keys):
+                field = dict((f.attname, f) for f in resource._meta.fields).get(attname)
+                if not hasattr(field, 'of'):
+                    raise TypeError("`%s` is not a composite field of %r." % (attname, resource))
+                keys[idx] = field.name
+                resource = field.of
+            if not isinstance(field, ArrayOf):
+                raise TypeError("Path `%s` does not end in an ArrayOf field." % path)
+
+    resource_name = _get_resource_name(resource)
+    for idx, obj in enumerate(iter_array(fp, keys, chunk_size or DEFAULT_CHUNK_SIZE)):
+        try:
+            yield build_object_graph(obj, resource_name, trusted, lazy, only)
+        except ValidationError as ve:
+            raise ValidationError({str(idx): ve.error_messages})
+
+
+def load_lines(fp, resource=None, trusted=False, lazy=False, only=None):
+    """
+    Iterate resources from a JSON Lines (newline delimited JSON) file, each line contains a single resource. Blank
+    lines are ignored.
+
+    See ``loads`` for a complete explanation of other parameters. A ``ValidationError`` raised for a line is keyed by
+    the line number (starting from 1).
+
+    :param fp: File pointer (or any iterable of lines) to read from.
+    """
+    from jsrn import backends
+    from jsrn.encoding import build_object_graph
+    from jsrn.exceptions import ValidationError
+
+    resource_name = _get_resource_name(resource)
+    decode = backends.get_backend().loads
+    for line_number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            yield build_object_graph(decode(line), resource_name, trusted, lazy, only)
+        except ValidationError as ve:
+            raise ValidationError({str(line_number): ve.error_messages})
+
+
+def dump_lines(resources, fp):
+    """
+    Dump an iterable of resources to a JSON Lines (newline delimited JSON) file, one resource per line.
+
+    :param resources: Iterable of resources to dump.
+    :param fp: The file pointer that represents the output file.
+    """
+    from jsrn.backends import get_backend
+    encode = get_backend().dumps
+    write = fp.write
+    for resource in resources:
+        write(encode(resource) + '\n')
+
+
+def load_parallel(fp, resource=None, lines=False, trusted=False, only=None, chunk_size=None, workers=None, pool=None):
+    """
+    Load from a JSON encoded file decoding resources across a pool of processes.
+
+    See ``loads_parallel`` for a complete explanation of parameters. JSON Lines files are read line by line rather
+    than being read into memory before decoding starts.
+    """
+    if not lines:
+        return loads_parallel(fp.read(), resource, lines, trusted, only, chunk_size, workers, pool)
+
+    from jsrn.parallel import decode_items, DEFAULT_CHUNK_SIZE
+    items = ((str(n), line) for n, line in enumerate(fp, 1) if line.strip())
+    return decode_items(items, True, _get_resource_name(resource), trusted, only, chunk_size or DEFAULT_CHUNK_SIZE,
+                        workers, pool)
+
+
+def loads_parallel(s, resource=None, lines=False, trusted=False, only=None, chunk_size=None, workers=None, pool=None):
+    """
+    Load from a JSON encoded string, where the document is an array (or JSON Lines), decoding and validating resources
+    across a pool of processes.
+
+    The array is split into chunks of ``chunk_size`` elements that are each decoded by a worker process, results are
+    returned in order. Validation errors from all chunks are collected into a single ``ValidationError`` keyed by the
+    index of the element (or line number for JSON Lines). See ``jsrn.parallel`` for details of requirements of worker
+    processes.
+
+    See ``loads`` for a complete explanation of other parameters.
+
+    :param s: String to load and parse.
+    :param resource: A resource type or a resource name to use as the base for creating resources.
+    :param lines: The string is JSON Lines (one resource per line).
+    :param chunk_size: Number of elements decoded by a worker at a time.
+    :param workers: Number of worker processes; default is the number of CPUs.
+    :param pool: An existing ``multiprocessing.Pool`` to use, avoiding the cost of starting processes.
+    """
+    from jsrn import backends
+    from jsrn.parallel import decode_items, DEFAULT_CHUNK_SIZE
+    resource_name = _get_resource_name(resource)
+
+    if lines:
+        items = ((str(n), line) for n, line in enumerate(s.splitlines(), 1) if line.strip())
     else:
-        resource_name = resource
-    return build_object_graph(json.loads(s), resource_name)
+        obj = backends.loads(s)
+        if not isinstance(obj, list):
+            from jsrn.encoding import build_object_graph
+            return build_object_graph(obj, resource_name, trusted, only=only)
+        items = ((str(idx), value) for idx, value in enumerate(obj))
+
+    return decode_items(items, lines, resource_name, trusted, only, chunk_size or DEFAULT_CHUNK_SIZE, workers, pool)
 
 
 def dump(resource, fp, pretty_print=False):
@@ -49,8 +251,25 @@ def dump(resource, fp, pretty_print=False):
     :param fp: The rile pointer that represents the output file.
     :param pretty_print: Pretty print the output, ie apply newline characters and indentation.
     """
-    from jsrn.encoding import JSRNEncoder
-    return json.dump(resource, fp, cls=JSRNEncoder, indent=4 if pretty_print else None)
+    from jsrn import backends
+    backends.dump(resource, fp, pretty_print)
+
+
+def dump_iter(resources, fp, pretty_print=False):
+    """
+    Dump an iterable of resources to a JSON encoded file as an array.
+
+    Resources are encoded and written as they are produced by the iterable (eg a generator) so memory use does not
+    depend on the number of resources. See ``jsrn.streaming.ResourceWriter``.
+
+    :param resources: Iterable of resources to dump.
+    :param fp: The file pointer that represents the output file.
+    :param pretty_print: Pretty print the output, ie apply newline characters and indentation.
+    """
+    from jsrn.streaming import ResourceWriter
+    with ResourceWriter(fp, pretty_print) as writer:
+        for resource in resources:
+            writer.write(resource)
 
 
 def dumps(resource, pretty_print=True):
@@ -60,5 +279,63 @@ def dumps(resource, pretty_print=True):
     :param resource: The root resource to dump to a JSON encoded file.
     :param pretty_print: Pretty print the output, ie apply newline characters and indentation.
     """
-    from jsrn.encoding import JSRNEncoder
-    return json.dumps(resource, cls=JSRNEncoder, indent=4 if pretty_print else None)
+    from jsrn import backends
+    return backends.dumps(resource, pretty_print)
+
+
+def dumpb(resource, pretty_print=False):
+    """
+    Dump to UTF-8 encoded JSON ``bytes`` (eg for the body of a HTTP response). Where the JSON backend produces bytes
+    directly (see ``jsrn.backends``) no intermediate string is created.
+
+    :param resource: The root resource to dump.
+    :param pretty_print: Pretty print the output, ie apply newline characters and indentation.
+    """
+    from jsrn import backends
+    return backends.dumpb(resource, pretty_print)
+
+
+def load_binary(fp, *args, **kwargs):
+    """
+    Load from a binary encoded file (opened in binary mode).
+
+    See ``loads_binary`` for a complete explanation of other parameters and operation of this method.
+    """
+    return loads_binary(fp.read(), *args, **kwargs)
+
+
+def loads_binary(data, resource=None, trusted=False, lazy=False, only=None):
+    """
+    Load from a binary encoded document produced by ``dumps_binary``.
+
+    Both ends must share the same resource definitions as fields are identified by position (see ``jsrn.binary``).
+    See ``loads`` for a complete explanation of other parameters.
+
+    :param data: Bytes to load.
+    """
+    from jsrn import binary
+    from jsrn.encoding import build_object_graph
+    return build_object_graph(binary.loads(data), _get_resource_name(resource), trusted, lazy, only)
+
+
+def dump_binary(resource, fp):
+    """
+    Dump to a binary encoded file (opened in binary mode).
+
+    :param resource: The root resource (or list of resources) to dump.
+    :param fp: The file pointer that represents the output file.
+    """
+    fp.write(dumps_binary(resource))
+
+
+def dumps_binary(resource):
+    """
+    Dump to a compact binary encoded string (``bytes``).
+
+    Values are encoded with MessagePack, field names are replaced by the position of the field and resource names are
+    written once in a table, see ``jsrn.binary``.
+
+    :param resource: The root resource (or list of resources) to dump.
+    """
+    from jsrn import binary
+    return binary.dumps(resource)
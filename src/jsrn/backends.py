@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+JSON libraries used to parse and serialise documents.
+
+The fastest installed library is used; `orjson <https://github.com/ijl/orjson>`_,
+`python-rapidjson <https://github.com/python-rapidjson/python-rapidjson>`_ and
+`ujson <https://github.com/ultrajson/ultrajson>`_ are supported, otherwise ``simplejson`` or the standard library
+``json`` module is used. A backend can be selected with ``set_backend`` or the ``JSRN_JSON_BACKEND`` environment
+variable.
+
+Resources are converted into JSON values before serialisation by ``encoding.to_json_value`` (using an encoder compiled
+for each resource type) rather than by a ``default`` hook, the hook is only used for values the converter does not
+understand. The standard library backend continues to use ``JSRNEncoder`` as it is faster for that library.
+
+Output of the backends may differ in formatting, eg non ASCII characters are not escaped by the faster backends. Pretty
+printed output (an indent of 4) is always produced by the standard library backend if the selected library does not
+support it. Values orjson cannot represent like the standard library (integers wider than 64 bits, ``NaN`` and
+``Infinity`` that orjson would write as ``null``) are serialised by the standard library backend, likewise documents
+orjson cannot parse (eg containing ``NaN``) are parsed by the standard library backend.
+"""
+import mmap
+import os
+import time
+import six
+from jsrn.encoding import JSRNEncoder, to_json_value
+
+BACKEND_ENV = 'JSRN_JSON_BACKEND'
+
+
+def _default(o):
+    value = to_json_value(o)
+    if value is o:
+        raise TypeError("Object of type %s is not JSON serializable" % type(o).__name__)
+    return value
+
+
+_INFINITY = float('inf')
+# Types that are (or may contain) non finite floats.
+_FLOAT_OR_CONTAINER_TYPES = (float, dict, list)
+
+
+def _contains_non_finite(o):
+    """
+    Value (converted by ``to_json_value``) contains a ``NaN`` or ``Infinity`` float.
+    """
+    value_type = type(o)
+    if value_type is float:
+        return o != o or o in (_INFINITY, -_INFINITY)
+    if value_type is dict:
+        o = six.itervalues(o)
+    elif value_type is not list:
+        return False
+    for v in o:
+        if type(v) in _FLOAT_OR_CONTAINER_TYPES and _contains_non_finite(v):
+            return True
+    return False
+
+
+class JSONBackend(object):
+    """
+    Base class for JSON backends.
+    """
+    name = None
+    # The library supports an indent of 4 for pretty printing.
+    supports_indent = True
+
+    def loads(self, s):
+        """
+        Parse a JSON document (``str`` or ``bytes``).
+
+        :raises ValueError: The document is not valid JSON.
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj, pretty_print=False):
+        """
+        Serialise a value (that may contain resources) into a JSON string.
+        """
+        raise NotImplementedError
+
+    def dump(self, obj, fp, pretty_print=False):
+        """
+        Serialise a value (that may contain resources) into a file opened in text mode.
+        """
+        fp.write(self.dumps(obj, pretty_print))
+
+    def loadb(self, data):
+        """
+        Parse a UTF-8 encoded JSON document from ``bytes``, ``bytearray`` or ``memoryview``.
+
+        :raises ValueError: The document is not valid JSON.
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self.loads(data)
+
+    def dumpb(self, obj, pretty_print=False):
+        """
+        Serialise a value (that may contain resources) into UTF-8 encoded ``bytes``.
+        """
+        return self.dumps(obj, pretty_print).encode('utf-8')
+
+
+class StandardBackend(JSONBackend):
+    """
+    Backend using ``simplejson`` (if installed) or the standard library ``json`` module.
+    """
+    def __init__(self):
+        try:
+            import simplejson as json
+        except ImportError:
+            import json
+        self.name = json.__name__
+        self.loads = json.loads
+        self._dumps = json.dumps
+        self._dump = json.dump
+
+    def dumps(self, obj, pretty_print=False):
+        return self._dumps(obj, cls=JSRNEncoder, indent=4 if pretty_print else None)
+
+    def dump(self, obj, fp, pretty_print=False):
+        # Written in chunks as it is encoded rather than building the entire document first.
+        self._dump(obj, fp, cls=JSRNEncoder, indent=4 if pretty_print else None)
+
+
+class OrjsonBackend(JSONBackend):
+    name = 'orjson'
+    supports_indent = False
+
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        # Keys of ObjectField dicts may be ints etc (converted to strings like the standard library).
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, s):
+        try:
+            # Accepts bytes, bytearray and memoryview without a copy.
+            return self._loads(s)
+        except ValueError:
+            # NaN and Infinity (written by the standard library backend) are not supported by orjson; an invalid
+            # document is also reported by the standard library.
+            if isinstance(s, memoryview):
+                s = s.tobytes()
+            return get_backend('json').loads(s)
+
+    loadb = loads
+
+    def dumps(self, obj, pretty_print=False):
+        return self.dumpb(obj).decode('utf-8')
+
+    def dumpb(self, obj, pretty_print=False):
+        # Produces bytes directly.
+        value = to_json_value(obj)
+        try:
+            data = self._dumps(value, default=_default, option=self._option)
+        except TypeError:
+            # Integers wider than 64 bits (an unsupported type is also reported by the standard library).
+            return get_backend('json').dumpb(obj)
+        # NaN and Infinity are written as null, only search for them if the document contains a null.
+        if b'null' in data and _contains_non_finite(value):
+            return get_backend('json').dumpb(obj)
+        return data
+
+
+class RapidJSONBackend(JSONBackend):
+    name = 'rapidjson'
+
+    def __init__(self):
+        import rapidjson
+        self.loads = rapidjson.loads
+        self._dumps = rapidjson.dumps
+
+    def dumps(self, obj, pretty_print=False):
+        return self._dumps(to_json_value(obj), default=_default, ensure_ascii=False, indent=4 if pretty_print else None)
+
+
+class UltraJSONBackend(JSONBackend):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self.loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def dumps(self, obj, pretty_print=False):
+        return self._dumps(to_json_value(obj), default=_default, ensure_ascii=False, escape_forward_slashes=False,
+                           indent=4 if pretty_print else 0)
+
+
+# Backends in order of preference.
+BACKENDS = (
+    ('orjson', OrjsonBackend),
+    ('rapidjson', RapidJSONBackend),
+    ('ujson', UltraJSONBackend),
+    ('json', StandardBackend),
+)
+_backends = {}
+_selected = os.environ.get(BACKEND_ENV) or 'auto'
+
+
+def _create_backend(name):
+    if name not in _backends:
+        backend_type = dict(BACKENDS).get(name)
+        if backend_type is None:
+            raise ValueError("Unknown JSON backend `%s`." % name)
+        try:
+            _backends[name] = backend_type()
+        except ImportError:
+            _backends[name] = None
+    return _backends[name]
+
+
+def available_backends():
+    """
+    Names of backends whose library is installed, in order of preference.
+    """
+    return [name for name, _ in BACKENDS if _create_backend(name) is not None]
+
+
+def get_backend(name=None):
+    """
+    Get a backend by name, or the selected backend (see ``set_backend``) if a name is not supplied.
+
+    :raises ValueError: Unknown backend.
+    :raises ImportError: The library of the backend is not installed.
+    """
+    name = name or _selected
+    if name == 'auto':
+        name = available_backends()[0]
+    backend = _create_backend(name)
+    if backend is None:
+        raise ImportError("JSON backend `%s` is not installed." % name)
+    return backend
+
+
+def set_backend(name):
+    """
+    Select the backend used by ``jsrn.loads``, ``jsrn.dumps`` etc; ``auto`` selects the fastest installed backend.
+
+    :raises ValueError: Unknown backend.
+    :raises ImportError: The library of the backend is not installed.
+    """
+    global _selected
+    if name != 'auto':
+        get_backend(name)
+    _selected = name
+
+
+def loads(s):
+    """
+    Parse a JSON document with the selected backend.
+    """
+    return get_backend().loads(s)
+
+
+def dumps(obj, pretty_print=False):
+    """
+    Serialise a value (that may contain resources) with the selected backend.
+    """
+    backend = get_backend()
+    if pretty_print and not backend.supports_indent:
+        backend = get_backend('json')
+    return backend.dumps(obj, pretty_print)
+
+
+def dump(obj, fp, pretty_print=False):
+    """
+    Serialise a value (that may contain resources) into a file opened in text mode with the selected backend. The
+    standard library backend writes the document in chunks as it is encoded, other backends write a single string.
+    """
+    backend = get_backend()
+    if pretty_print and not backend.supports_indent:
+        backend = get_backend('json')
+    backend.dump(obj, fp, pretty_print)
+
+
+def loadb(data):
+    """
+    Parse a UTF-8 encoded JSON document (``bytes``, ``bytearray`` or ``memoryview``) with the selected backend.
+    """
+    return get_backend().loadb(data)
+
+
+def dumpb(obj, pretty_print=False):
+    """
+    Serialise a value (that may contain resources) into UTF-8 encoded ``bytes`` with the selected backend.
+    """
+    backend = get_backend()
+    if pretty_print and not backend.supports_indent:
+        backend = get_backend('json')
+    return backend.dumpb(obj, pretty_print)
+
+
+def load_file(fp, use_mmap=True):
+    """
+    Parse a UTF-8 encoded JSON document from a file opened in binary mode with the selected backend.
+
+    With ``use_mmap`` the file is memory mapped and parsed from the mapping. If the backend parses from a buffer
+    without copying it (eg orjson) the text of the document is never held in memory, pages of the mapping are read by
+    the operating system as they are parsed and can be discarded under memory pressure. Files that cannot be mapped
+    (eg empty files or pipes) are read.
+    """
+    if use_mmap:
+        try:
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, IOError, OSError, ValueError):
+            mapped = None
+        if mapped is not None:
+            try:
+                if six.PY2:
+                    # A memoryview of a memory map is not supported.
+                    return loadb(mapped[:])
+                view = memoryview(mapped)
+                try:
+                    return loadb(view)
+                finally:
+                    view.release()
+            finally:
+                mapped.close()
+    return loadb(fp.read())
+
+
+def benchmark(obj, number=10, backends=None):
+    """
+    Measure the throughput of each installed backend serialising and parsing a value (eg a list of resources that is
+    typical of the documents of an application).
+
+    :param obj: Value to serialise and parse.
+    :param number: Number of times each operation is repeated, the fastest time is used.
+    :param backends: Names of backends to measure, defaults to all installed backends.
+    :returns: dict of backend name to a dict of ``dumps`` and ``loads`` throughput (in bytes of JSON per second).
+    """
+    def best_time(func, arg):
+        times = []
+        for _ in range(number):
+            start = time.time()
+            func(arg)
+            times.append(time.time() - start)
+        # Avoid dividing by zero for tiny documents.
+        return max(min(times), 1e-9)
+
+    results = {}
+    for name in backends or available_backends():
+        backend = get_backend(name)
+        s = backend.dumps(obj)
+        size = len(s.encode('utf-8'))
+        results[name] = {
+            'dumps': size / best_time(backend.dumps, obj),
+            'loads': size / best_time(backend.loads, s),
+        }
+    return results
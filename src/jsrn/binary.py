@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+Compact binary encoding of resources for use where both ends share the resource definitions.
+
+Documents are encoded using `MessagePack <http://msgpack.org/>`_; if the ``msgpack`` package is installed it is used,
+otherwise a pure Python implementation is used. Rather than repeating field names and the ``$`` field for every
+object, a resource is encoded as an array of a type index followed by its field values in field order. Type indexes
+refer to a table of resource names that is written once at the start of the document::
+
+    [FORMAT_VERSION, ["library.Book", "library.Author"], [0, "Consider Phlebas", [[1, "Iain M. Banks"]], ...]]
+
+Field values are the same values that are used for JSON encoding (the result of ``to_json``). Documents are decoded
+back into dicts with a ``$`` field so values are converted and validated exactly as for a JSON document.
+"""
+import struct
+import six
+from jsrn import registration
+from jsrn.exceptions import ValidationError
+from jsrn.fields.composite import ArrayOf
+from jsrn.resources import Resource, RESOURCE_TYPE_FIELD
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_VERSION = 1
+
+_pack_uint8 = struct.Struct('>B').pack
+_pack_uint16 = struct.Struct('>H').pack
+_pack_uint32 = struct.Struct('>I').pack
+_pack_uint64 = struct.Struct('>Q').pack
+_pack_int8 = struct.Struct('>b').pack
+_pack_int16 = struct.Struct('>h').pack
+_pack_int32 = struct.Struct('>i').pack
+_pack_int64 = struct.Struct('>q').pack
+_pack_float64 = struct.Struct('>d').pack
+
+_unpack_from = struct.unpack_from
+# Formats and sizes of fixed size values and length prefixes, keyed by type byte.
+_FIXED_FORMATS = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+_LENGTH_FORMATS = {
+    0xc4: ('>B', 1), 0xc5: ('>H', 2), 0xc6: ('>I', 4),  # bin
+    0xd9: ('>B', 1), 0xda: ('>H', 2), 0xdb: ('>I', 4),  # str
+    0xdc: ('>H', 2), 0xdd: ('>I', 4),  # array
+    0xde: ('>H', 2), 0xdf: ('>I', 4),  # map
+}
+
+
+def _pack_header(write, length, fix_type, fix_limit, type8, type16, type32):
+    if length < fix_limit:
+        write(_pack_uint8(fix_type | length))
+    elif type8 is not None and length < 0x100:
+        write(_pack_uint8(type8) + _pack_uint8(length))
+    elif length < 0x10000:
+        write(_pack_uint8(type16) + _pack_uint16(length))
+    else:
+        write(_pack_uint8(type32) + _pack_uint32(length))
+
+
+def packb(obj, default=None):
+    """
+    Pack a value into MessagePack (pure Python implementation).
+
+    :param obj: Value to pack; ``None``, booleans, integers, floats, strings, bytes, lists, tuples and dicts.
+    :param default: Function called to convert any other value into a value that can be packed.
+    :raises TypeError: Value cannot be packed.
+    """
+    chunks = []
+    write = chunks.append
+
+    def pack(o):
+        if o is None:
+            write(b'\xc0')
+        elif o is True:
+            write(b'\xc3')
+        elif o is False:
+            write(b'\xc2')
+        elif isinstance(o, six.integer_types):
+            if 0 <= o < 0x80:
+                write(_pack_uint8(o))
+            elif -0x20 <= o < 0:
+                write(_pack_int8(o))
+            elif o >= 0:
+                if o < 0x100:
+                    write(b'\xcc' + _pack_uint8(o))
+                elif o < 0x10000:
+                    write(b'\xcd' + _pack_uint16(o))
+                elif o < 0x100000000:
+                    write(b'\xce' + _pack_uint32(o))
+                elif o < 0x10000000000000000:
+                    write(b'\xcf' + _pack_uint64(o))
+                else:
+                    raise OverflowError("Integer value out of range")
+            elif o >= -0x80:
+                write(b'\xd0' + _pack_int8(o))
+            elif o >= -0x8000:
+                write(b'\xd1' + _pack_int16(o))
+            elif o >= -0x80000000:
+                write(b'\xd2' + _pack_int32(o))
+            elif o >= -0x8000000000000000:
+                write(b'\xd3' + _pack_int64(o))
+            else:
+                raise OverflowError("Integer value out of range")
+        elif isinstance(o, float):
+            write(b'\xcb' + _pack_float64(o))
+        elif isinstance(o, six.text_type):
+            data = o.encode('utf-8')
+            _pack_header(write, len(data), 0xa0, 32, 0xd9, 0xda, 0xdb)
+            write(data)
+        elif isinstance(o, (six.binary_type, bytearray)):
+            _pack_header(write, len(o), None, 0, 0xc4, 0xc5, 0xc6)
+            write(bytes(o))
+        elif isinstance(o, (list, tuple)):
+            _pack_header(write, len(o), 0x90, 16, None, 0xdc, 0xdd)
+            for value in o:
+                pack(value)
+        elif isinstance(o, dict):
+            _pack_header(write, len(o), 0x80, 16, None, 0xde, 0xdf)
+            for key, value in six.iteritems(o):
+                pack(key)
+                pack(value)
+        elif default is not None:
+            pack(default(o))
+        else:
+            raise TypeError("Object of type %s cannot be packed." % type(o).__name__)
+
+    pack(obj)
+    return b''.join(chunks)
+
+
+def _unpack(data, pos):
+    code = data[pos]
+    pos += 1
+
+    if code <= 0x7f:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code <= 0x8f:
+        length, code = code & 0x0f, 0xde
+    elif code <= 0x9f:
+        length, code = code & 0x0f, 0xdc
+    elif code <= 0xbf:
+        length, code = code & 0x1f, 0xd9
+    elif code == 0xc0:
+        return None, pos
+    elif code == 0xc2:
+        return False, pos
+    elif code == 0xc3:
+        return True, pos
+    elif code in _FIXED_FORMATS:
+        fmt, size = _FIXED_FORMATS[code]
+        return _unpack_from(fmt, data, pos)[0], pos + size
+    elif code in _LENGTH_FORMATS:
+        fmt, size = _LENGTH_FORMATS[code]
+        length = _unpack_from(fmt, data, pos)[0]
+        pos += size
+    else:
+        raise ValueError("Unsupported MessagePack type 0x%02x at position %d." % (code, pos - 1))
+
+    if code in (0xdc, 0xdd):
+        values = []
+        append = values.append
+        for _ in range(length):
+            value, pos = _unpack(data, pos)
+            append(value)
+        return values, pos
+    if code in (0xde, 0xdf):
+        values = {}
+        for _ in range(length):
+            key, pos = _unpack(data, pos)
+            values[key], pos = _unpack(data, pos)
+        return values, pos
+
+    end = pos + length
+    if end > len(data):
+        raise ValueError("Unexpected end of data.")
+    if code in (0xc4, 0xc5, 0xc6):
+        return bytes(data[pos:end]), end
+    return data[pos:end].decode('utf-8'), end
+
+
+def unpackb(data):
+    """
+    Unpack a MessagePack encoded value (pure Python implementation).
+
+    :param data: ``bytes``, ``bytearray`` or ``memoryview`` to unpack.
+    :raises ValueError: Data is not valid MessagePack or contains extra data.
+    """
+    if six.PY2:
+        # Indexing a bytearray yields integers.
+        data = bytearray(data)
+    elif not isinstance(data, bytes):
+        data = bytes(data)
+    try:
+        value, pos = _unpack(data, 0)
+    except (IndexError, struct.error):
+        raise ValueError("Unexpected end of data.")
+    if pos != len(data):
+        raise ValueError("Extra data found after position %d." % pos)
+    return value
+
+
+def _get_layout(resource_type):
+    """
+    Layout of the binary record of a resource type; a tuple of field names (in record order) and a tuple of composite
+    fields as ``(position, name, is_array)``.
+    """
+    meta = resource_type._meta
+    if not hasattr(meta, '_binary_layout'):
+        fields = meta.fields
+        meta._binary_layout = (
+            tuple(f.name for f in fields),
+            tuple((idx, f.name, isinstance(f, ArrayOf)) for idx, f in enumerate(fields) if hasattr(f, 'of'))
+        )
+    return meta._binary_layout
+
+
+def _encode_default(o):
+    # Resources nested within non-composite fields are encoded the same as for JSON.
+    if isinstance(o, Resource):
+        return o._meta.encoder(o)
+    raise TypeError("Object of type %s cannot be packed." % type(o).__name__)
+
+
+def _to_record(resource, type_table):
+    resource_type = type(resource)
+    meta = resource_type._meta
+    names, composites = _get_layout(resource_type)
+
+    resource_name = meta.resource_name
+    type_idx = type_table.get(resource_name)
+    if type_idx is None:
+        type_idx = type_table[resource_name] = len(type_table)
+
+    values = meta.encoder(resource)
+    record = [type_idx]
+    record.extend(values[name] for name in names)
+    for idx, _, is_array in composites:
+        value = record[idx + 1]
+        if is_array:
+            if value:
+                record[idx + 1] = [_to_record(v, type_table) if isinstance(v, Resource) else v for v in value]
+        elif isinstance(value, Resource):
+            record[idx + 1] = _to_record(value, type_table)
+    return record
+
+
+def _to_dict(record, layouts):
+    # Negative and bool indexes would select the wrong layout.
+    layout_index = record[0] if record else None
+    if type(layout_index) not in six.integer_types or not 0 <= layout_index < len(layouts):
+        raise ValidationError("Invalid resource record.")
+    resource_name, names, composites = layouts[layout_index]
+    if len(record) != len(names) + 1:
+        raise ValidationError("Resource `%s` expected %d values found %d." % (
+            resource_name, len(names), len(record) - 1))
+
+    obj = dict(zip(names, record[1:]))
+    for _, name, is_array in composites:
+        value = obj[name]
+        if not isinstance(value, list):
+            continue
+        if is_array:
+            obj[name] = [_to_dict(v, layouts) if isinstance(v, list) else v for v in value]
+        else:
+            obj[name] = _to_dict(value, layouts)
+    obj[RESOURCE_TYPE_FIELD] = resource_name
+    return obj
+
+
+def encode(resource):
+    """
+    Encode a resource (or list of resources) into a binary document structure ready for packing.
+    """
+    type_table = {}
+    if isinstance(resource, Resource):
+        root = _to_record(resource, type_table)
+    elif isinstance(resource, (list, tuple)):
+        root = [_to_record(r, type_table) for r in resource]
+    else:
+        raise TypeError("Only a resource or list of resources can be binary encoded.")
+
+    resource_names = sorted(type_table, key=type_table.get)
+    return [FORMAT_VERSION, resource_names, root]
+
+
+def decode(document):
+    """
+    Decode a binary document structure into the dict (or list of dicts) that would have been produced by decoding the
+    equivalent JSON document.
+
+    :raises ValueError: Not a binary JSRN document.
+    :raises ValidationError: Document refers to an unknown resource type or does not match the resource definitions.
+    """
+    if not (isinstance(document, list) and len(document) == 3 and document[0] == FORMAT_VERSION):
+        raise ValueError("Not a binary JSRN document.")
+    _, resource_names, root = document
+
+    layouts = []
+    for resource_name in resource_names:
+        resource_type = registration.get_resource(resource_name)
+        if not resource_type:
+            raise ValidationError("Resource `%s` is not registered." % resource_name)
+        layouts.append((resource_name, ) + _get_layout(resource_type))
+
+    if root and isinstance(root[0], list):
+        return [_to_dict(record, layouts) for record in root]
+    elif root:
+        return _to_dict(root, layouts)
+    return []
+
+
+def dumps(resource):
+    """
+    Dump a resource (or list of resources) into a binary document.
+    """
+    document = encode(resource)
+    if msgpack is not None:
+        return msgpack.packb(document, default=_encode_default, use_bin_type=True)
+    return packb(document, default=_encode_default)
+
+
+def loads(data):
+    """
+    Load a binary document into dicts (see ``decode``), resources are built by ``jsrn.loads_binary``.
+    """
+    if msgpack is not None:
+        try:
+            document = msgpack.unpackb(data, raw=False)
+        except Exception as ex:
+            raise ValueError(str(ex))
+    else:
+        document = unpackb(data)
+    return decode(document)
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+"""
+Generation of specialised codecs for resources.
+
+Rather than looping over ``_meta.fields`` for every document, the functions in this module generate a function that is
+unrolled for the fields of a particular resource type with any field methods bound up front. Generated functions are
+cached on the resource options (see ``ResourceOptions.decoder`` and ``ResourceOptions.encoder``).
+
+Compiling generated functions is the most expensive part of generation. Code can be cached in a directory so that it is
+reused by later processes (see ``set_code_cache_dir``); cached code is keyed by a fingerprint of the resource type (see
+``schema_fingerprint``) so it is not reused if the definition of a resource changes.
+"""
+import binascii
+import hashlib
+import marshal
+import os
+import tempfile
+import six
+from jsrn import exceptions
+from jsrn.fields import Field, NOT_PROVIDED, BooleanField, DateTimeField, ScalarField, StringField
+from jsrn.resources import Resource, RESOURCE_TYPE_FIELD, unpickle_resource
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:
+    # Python 2
+    from imp import get_magic
+    MAGIC_NUMBER = get_magic()
+
+# Version of the generated code, increment when generated source changes so cached code is not reused.
+CODE_VERSION = 2
+CODE_CACHE_DIR_ENV = 'JSRN_CODE_CACHE_DIR'
+# Field methods that change the generated source if overridden by a field.
+FINGERPRINT_METHOD_NAMES = ('clean', 'to_python', 'to_python_trusted', 'validate', 'run_validators', 'to_json',
+                            'value_from_object')
+
+
+def _is_overridden(field, method_name):
+    """
+    Check if a field overrides the default implementation of a method on the base ``Field`` class.
+    """
+    return getattr(type(field), method_name) is not getattr(Field, method_name)
+
+
+def _describe_validator(validator):
+    return '%s.%s(%r)' % (type(validator).__module__, type(validator).__name__,
+                          getattr(validator, 'limit_value', getattr(validator, '__name__', None)))
+
+
+def schema_fingerprint(resource_type):
+    """
+    Fingerprint of the definition of a resource type. It is built from the type, names and options (including
+    validators) of each field and anything else that affects generated code.
+
+    The fingerprint is stable between processes (and is cached on the resource options), it includes the version of
+    the generated code and the Python bytecode version.
+    """
+    meta = resource_type._meta
+    if not hasattr(meta, '_schema_fingerprint'):
+        parts = [
+            CODE_VERSION, binascii.hexlify(MAGIC_NUMBER), meta.resource_name, meta.slots,
+            _uses_default_init(resource_type), bool(resource_type.__dictoffset__), _get_extra_slot_names(resource_type),
+        ]
+        for f in meta.fields:
+            parts.append((
+                type(f).__module__, type(f).__name__, f.name, f.attname, f.null, f.use_default_if_not_provided,
+                repr(f.choices), [_describe_validator(v) for v in f.validators],
+                hasattr(f, 'of'),
+                [name for name in FINGERPRINT_METHOD_NAMES if _is_overridden(f, name)],
+            ))
+        meta._schema_fingerprint = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return meta._schema_fingerprint
+
+
+class CodeCache(object):
+    """
+    Directory of compiled code of generated functions.
+
+    Cached code is executed when loaded, the directory must only be writable by trusted users.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def _get_filename(self, key):
+        return os.path.join(self.path, key + '.jsrnc')
+
+    def get(self, key):
+        """
+        Get a tuple of function name and code object or ``None`` if the key is not cached (or cannot be read).
+        """
+        try:
+            with open(self._get_filename(key), 'rb') as fp:
+                function_name, code = marshal.load(fp)
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            return None
+        return function_name, code
+
+    def set(self, key, function_name, code):
+        """
+        Cache the code of a function. The file is written atomically so concurrent processes can share a directory,
+        errors writing to the cache are ignored.
+        """
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            fd, temp_filename = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fp:
+                marshal.dump((function_name, code), fp)
+            try:
+                os.rename(temp_filename, self._get_filename(key))
+            except OSError:
+                # Windows does not replace an existing file (cached by another process).
+                os.remove(temp_filename)
+        except (IOError, OSError):
+            pass
+
+
+code_cache = CodeCache(os.environ[CODE_CACHE_DIR_ENV]) if os.environ.get(CODE_CACHE_DIR_ENV) else None
+
+
+def set_code_cache_dir(path):
+    """
+    Cache compiled code of generated functions in a directory (or disable caching if ``path`` is ``None``). The cache
+    can also be enabled with the ``JSRN_CODE_CACHE_DIR`` environment variable.
+
+    Functions that have already been generated are not affected.
+    """
+    global code_cache
+    code_cache = CodeCache(path) if path else None
+
+
+def _compile(source, function_name, namespace, filename):
+    code = compile(source, filename, 'exec')
+    six.exec_(code, namespace)
+    return namespace[function_name]
+
+
+def _compile_cached(resource_type, kind, generate, namespace, filename):
+    """
+    Compile a generated function, the compiled code is reused from the code cache (if enabled) when the resource type
+    has the same fingerprint.
+
+    :param kind: Kind of function, along with the fingerprint this forms the cache key.
+    :param generate: Callable that generates the function name and source.
+    """
+    cache = code_cache
+    if cache is None:
+        function_name, source = generate()
+        return _compile(source, function_name, namespace, filename)
+
+    key = '%s-%s' % (kind, schema_fingerprint(resource_type))
+    cached = cache.get(key)
+    if cached is None:
+        function_name, source = generate()
+        code = compile(source, filename, 'exec')
+        cache.set(key, function_name, code)
+    else:
+        function_name, code = cached
+    six.exec_(code, namespace)
+    return namespace[function_name]
+
+
+def _uses_default_init(resource_type):
+    return resource_type.__init__ is Resource.__init__
+
+
+def generate_decoder_source(resource_type, trusted=False, projection=None):
+    """
+    Generate the source of a decoder function for a resource type.
+
+    The generated function accepts a dict (with the resource type field already removed) and returns a new, validated
+    resource. Names used by the function are supplied by ``get_namespace``.
+
+    :param resource_type: The resource type to generate a decoder for.
+    :param trusted: Generate a decoder for trusted data, values are converted but no validation is performed.
+    :param projection: Only decode the selected fields (see ``resources.parse_projection``); other fields are set to
+        ``None``. As the resource is incomplete ``extra_attrs`` and the resource level ``clean`` are not called.
+    :returns: tuple of function name and source.
+    """
+    direct_assign = _uses_default_init(resource_type)
+    function_name = '%s%s_%s' % ('decode_trusted' if trusted else 'decode', '_projected' if projection else '',
+                                 resource_type.__name__)
+
+    if trusted:
+        source = ["def %s(obj):" % function_name]
+    else:
+        source = [
+            "def %s(obj, errors=None):" % function_name,
+            "    raise_errors = errors is None",
+            "    if raise_errors:",
+            "        errors = {}",
+        ]
+    source.append("    pop = obj.pop")
+    if direct_assign:
+        # Bypass __init__, all fields are assigned below.
+        source.append("    new_resource = new(resource_type)")
+    else:
+        source.append("    attrs = {}")
+
+    for idx, f in enumerate(resource_type._meta.fields):
+        if direct_assign:
+            target = "new_resource.%s" % f.attname
+        else:
+            target = "attrs[%r]" % f.attname
+        assign = target + " = value"
+        default = "get_default_%d()" % idx if f.use_default_if_not_provided else "None"
+
+        if projection is not None and f.attname not in projection:
+            source.append("    %s = None" % target)
+            continue
+        # Composite fields accept paths to select fields of child resources.
+        only = ", only=only_%d" % idx if projection and projection[f.attname] and hasattr(f, 'of') else ""
+
+        source.append("    value = pop(%r, NOT_PROVIDED)" % f.name)
+        if trusted:
+            source.append("    if value is NOT_PROVIDED:")
+            source.append("        value = " + default)
+            if only or _is_overridden(f, 'to_python_trusted') or _is_overridden(f, 'to_python'):
+                # Conversion errors are keyed by field name like errors of untrusted data.
+                source.append("    try:")
+                source.append("        value = to_python_trusted_%d(value%s)" % (idx, only))
+                source.append("    except ValidationError as ve:")
+                source.append("        raise ValidationError({%r: ve.error_messages})" % f.name)
+            source.append("    " + assign)
+            continue
+
+        # Errors are recorded by the check, the value of an invalid field is discarded with the resource.
+        source.append("    %s = check_%d(value, errors, %r%s)" % (target, idx, f.name, only))
+
+    if not trusted:
+        source.append("    if errors:")
+        source.append("        if raise_errors:")
+        source.append("            raise ValidationError(errors)")
+        source.append("        return None")
+    if not direct_assign:
+        source.append("    new_resource = resource_type(**attrs)")
+    if projection is None:
+        source.append("    if obj:")
+        source.append("        new_resource.extra_attrs(obj)")
+        if not trusted:
+            # Fields have been cleaned above so only resource level validation is required.
+            source.append("    try:")
+            source.append("        new_resource.clean()")
+            source.append("    except ValidationError as ve:")
+            source.append("        errors.update(ve.update_error_dict({}))")
+            source.append("        if raise_errors:")
+            source.append("            raise ValidationError(errors)")
+            source.append("        return None")
+    source.append("    return new_resource")
+    return function_name, '\n'.join(source) + '\n'
+
+
+def _is_scalar_field(field):
+    """
+    Check if values of a field are always JSON scalars (strings, numbers, booleans or null).
+    """
+    return isinstance(field, (BooleanField, StringField, ScalarField, DateTimeField))
+
+
+def generate_encoder_source(resource_type, walk=False):
+    """
+    Generate the source of an encoder function for a resource type.
+
+    The generated function accepts a resource and returns a dict ready for JSON encoding, including the resource type
+    field. Fields that do not override ``to_json`` have their value used as is.
+
+    :param walk: Also convert values of non scalar fields (eg child resources) with ``walk`` so the result only
+        contains JSON values.
+    :returns: tuple of function name and source.
+    """
+    function_name = '%s_%s' % ('walk' if walk else 'encode', resource_type.__name__)
+
+    source = [
+        "def %s(o):" % function_name,
+        "    return {",
+    ]
+    for idx, f in enumerate(resource_type._meta.fields):
+        if _is_overridden(f, 'value_from_object'):
+            value = "value_from_object_%d(o)" % idx
+        else:
+            value = "o.%s" % f.attname
+        if _is_overridden(f, 'to_json'):
+            value = "to_json_%d(%s)" % (idx, value)
+        if walk and not _is_scalar_field(f):
+            value = "walk(%s)" % value
+        source.append("        %r: %s," % (f.name, value))
+    source.append("        %r: %r," % (RESOURCE_TYPE_FIELD, resource_type._meta.resource_name))
+    source.append("    }")
+    return function_name, '\n'.join(source) + '\n'
+
+
+def _get_extra_slot_names(resource_type):
+    """
+    Names of slots (from all classes in the MRO) that are not used by fields.
+    """
+    attnames = set(f.attname for f in resource_type._meta.fields)
+    slot_names = []
+    for klass in resource_type.__mro__:
+        names = klass.__dict__.get('__slots__', ())
+        if isinstance(names, six.string_types):
+            names = (names,)
+        slot_names.extend(n for n in names if n not in attnames and n not in ('__dict__', '__weakref__'))
+    return slot_names
+
+
+def generate_reducer_source(resource_type):
+    """
+    Generate the source of a function that implements ``__reduce__`` for a resource type.
+
+    Field values are returned as a tuple in field order along with the resource type. Any other instance attributes
+    (including values of additional slots) are returned as state.
+
+    :returns: tuple of function name and source.
+    """
+    fields = resource_type._meta.fields
+    function_name = 'reduce_%s' % resource_type.__name__
+
+    source = [
+        "def %s(o):" % function_name,
+        "    values = (%s)" % ''.join("o.%s, " % f.attname for f in fields),
+        "    state = slot_state = None",
+    ]
+    if resource_type.__dictoffset__:
+        source.append("    d = o.__dict__")
+        source.append("    if len(d) > %d:" % len(fields))
+        source.append("        state = dict((k, v) for k, v in d.items() if k not in excluded_names) or None")
+    for slot_name in _get_extra_slot_names(resource_type):
+        source.append("    try:")
+        source.append("        value = o.%s" % slot_name)
+        source.append("    except AttributeError:")
+        source.append("        pass")
+        source.append("    else:")
+        source.append("        slot_state = slot_state or {}")
+        source.append("        slot_state[%r] = value" % slot_name)
+    source.append("    if slot_state:")
+    source.append("        return unpickle, (resource_type, values), (state, slot_state)")
+    source.append("    if state:")
+    source.append("        return unpickle, (resource_type, values), state")
+    source.append("    return unpickle, (resource_type, values)")
+    return function_name, '\n'.join(source) + '\n'
+
+
+def generate_restorer_source(resource_type):
+    """
+    Generate the source of a function that restores a resource from values produced by a reducer function. No
+    validation is performed.
+
+    :returns: tuple of function name and source.
+    """
+    fields = resource_type._meta.fields
+    function_name = 'restore_%s' % resource_type.__name__
+
+    source = [
+        "def %s(values):" % function_name,
+        "    new_resource = new(resource_type)",
+    ]
+    if fields:
+        source.append("    %s = values" % ''.join("new_resource.%s, " % f.attname for f in fields))
+    source.append("    return new_resource")
+    return function_name, '\n'.join(source) + '\n'
+
+
+def get_namespace(resource_type, projection=None, checks=False):
+    """
+    Get the namespace of names referenced by generated functions.
+
+    :param checks: Include the compiled checks of fields (see ``Field.compile_check``) used by decoders.
+    """
+    namespace = {
+        'ValidationError': exceptions.ValidationError,
+        'NOT_PROVIDED': NOT_PROVIDED,
+        'new': object.__new__,
+        'unpickle': unpickle_resource,
+        'resource_type': resource_type,
+        # Instance attributes that are not pickled as state
+        'excluded_names': frozenset([f.attname for f in resource_type._meta.fields] + ['_lazy_fields']),
+    }
+    for idx, f in enumerate(resource_type._meta.fields):
+        namespace['get_default_%d' % idx] = f.get_default
+        namespace['to_python_trusted_%d' % idx] = f.to_python_trusted
+        namespace['to_json_%d' % idx] = f.to_json
+        namespace['value_from_object_%d' % idx] = f.value_from_object
+        if projection:
+            namespace['only_%d' % idx] = projection.get(f.attname)
+        if checks:
+            namespace['check_%d' % idx] = f.compile_check()
+    return namespace
+
+
+def _get_decoder_kind(trusted, projection):
+    kind = 'decode_trusted' if trusted else 'decode'
+    if projection is not None:
+        # Generated source depends on the selected fields and if fields of child resources are selected.
+        selected = repr(sorted((attname, bool(paths)) for attname, paths in projection.items()))
+        kind += '_projected_' + hashlib.sha1(selected.encode('utf-8')).hexdigest()[:12]
+    return kind
+
+
+def compile_decoder(resource_type, trusted=False, projection=None):
+    """
+    Compile a decoder function for a resource type.
+
+    Each field is converted and validated exactly once, as fields have been cleaned only the resource level ``clean``
+    is called rather than ``full_clean``. A ``trusted`` decoder only converts values, no validation is performed. If a
+    ``projection`` is supplied only the selected fields are decoded.
+    """
+    return _compile_cached(resource_type, _get_decoder_kind(trusted, projection),
+                           lambda: generate_decoder_source(resource_type, trusted, projection),
+                           get_namespace(resource_type, projection, checks=not trusted),
+                           '<jsrn decoder %s>' % resource_type._meta.resource_name)
+
+
+def compile_encoder(resource_type, walk=False):
+    """
+    Compile an encoder function for a resource type.
+
+    The encoder produces the same output as the generic field loop previously used by ``JSRNEncoder``. With ``walk``
+    child resources are also converted (see ``encoding.to_json_value``).
+    """
+    namespace = get_namespace(resource_type)
+    if walk:
+        from jsrn.encoding import to_json_value
+        namespace['walk'] = to_json_value
+    return _compile_cached(resource_type, 'walk' if walk else 'encode',
+                           lambda: generate_encoder_source(resource_type, walk), namespace,
+                           '<jsrn encoder %s>' % resource_type._meta.resource_name)
+
+
+def compile_reducer(resource_type):
+    """
+    Compile a function that implements ``__reduce__`` for a resource type.
+    """
+    return _compile_cached(resource_type, 'reduce', lambda: generate_reducer_source(resource_type),
+                           get_namespace(resource_type), '<jsrn reducer %s>' % resource_type._meta.resource_name)
+
+
+def compile_restorer(resource_type):
+    """
+    Compile a function that restores a pickled resource.
+    """
+    return _compile_cached(resource_type, 'restore', lambda: generate_restorer_source(resource_type),
+                           get_namespace(resource_type), '<jsrn restorer %s>' % resource_type._meta.resource_name)
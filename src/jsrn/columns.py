@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar storage of large arrays of resources of a single type.
+
+Rather than a Python object (and attribute dict) per resource, a ``ResourceArray`` stores the values of each field in
+a column. ``IntegerField``, ``FloatField``, ``BooleanField`` and ``DateTimeField`` values are stored in typed arrays
+(``array.array``), other fields are stored in a list. If NumPy is installed it is used for validation and can be used
+to export the array as a structured array (``ResourceArray.to_numpy``).
+"""
+import array
+import datetime
+import six
+import types
+from jsrn import datetimeutil
+from jsrn.exceptions import ValidationError
+from jsrn.fields import BooleanField, DateTimeField, FloatField, IntegerField
+from jsrn.resources import Resource
+from jsrn.utils import get_numpy
+from jsrn.validators import MaxValueValidator, MinValueValidator, find_limit_failures
+
+# Array type code and NumPy dtype for typed columns; ordered so sub-classes are matched first.
+COLUMN_TYPES = (
+    (BooleanField, 'b', '?'),
+    (IntegerField, 'q', 'i8'),
+    (FloatField, 'd', 'f8'),
+    (DateTimeField, 'q', 'M8[us]'),
+)
+
+
+class Column(object):
+    """
+    Column of values stored in a list.
+    """
+    dtype = 'O'
+
+    def __init__(self, field, values=None):
+        self.field = field
+        self.values = list(values or [])
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        self.values.append(value)
+
+    def get(self, idx):
+        return self.values[idx]
+
+    def set(self, idx, value):
+        self.values[idx] = value
+
+    def to_list(self):
+        return list(self.values)
+
+    def _validate_value(self, value):
+        field = self.field
+        try:
+            field.validate(value)
+            field.run_validators(value)
+        except ValidationError as ve:
+            return ve.messages
+
+    def validate(self):
+        """
+        Validate every value in the column.
+
+        :returns: dict of error messages keyed by index.
+        """
+        errors = {}
+        for idx, value in enumerate(self.values):
+            messages = self._validate_value(value)
+            if messages:
+                errors[idx] = messages
+        return errors
+
+
+class TypedColumn(Column):
+    """
+    Column of values stored in a typed array; null values are stored as zero and their indexes are recorded.
+
+    Values that cannot be stored in the array raise ``TypeError`` or ``OverflowError``, the column can then be
+    replaced by a list based ``Column`` (see ``ResourceArray``).
+    """
+    def __init__(self, field, typecode, dtype):
+        self.field = field
+        self.typecode = typecode
+        self.dtype = dtype
+        self.values = array.array(typecode)
+        self.nulls = set()
+        self.is_datetime = isinstance(field, DateTimeField)
+
+    def to_storage(self, value):
+        if self.is_datetime:
+            if not isinstance(value, datetime.datetime):
+                raise TypeError("Expected a datetime.")
+            tz = datetimeutil.local if self.field.assume_local else datetimeutil.utc
+            delta = datetimeutil.get_tz_aware_dt(value, tz) - datetimeutil.EPOCH
+            return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+        if self.typecode == 'b' and not isinstance(value, bool):
+            raise TypeError("Expected a bool.")
+        return value
+
+    def from_storage(self, value):
+        if self.is_datetime:
+            dt = datetimeutil.EPOCH + datetime.timedelta(microseconds=value)
+            return dt.astimezone(datetimeutil.local) if self.field.assume_local else dt
+        if self.typecode == 'b':
+            return bool(value)
+        return value
+
+    def append(self, value):
+        if value is None:
+            self.nulls.add(len(self.values))
+            self.values.append(0)
+        else:
+            self.values.append(self.to_storage(value))
+
+    def get(self, idx):
+        if idx < 0:
+            idx += len(self.values)
+        if idx in self.nulls:
+            return None
+        return self.from_storage(self.values[idx])
+
+    def set(self, idx, value):
+        if idx < 0:
+            idx += len(self.values)
+        if value is None:
+            self.values[idx] = 0
+            self.nulls.add(idx)
+        else:
+            self.values[idx] = self.to_storage(value)
+            self.nulls.discard(idx)
+
+    def to_list(self):
+        return [self.get(idx) for idx in range(len(self.values))]
+
+    def to_numpy(self):
+        """
+        Get the column as a NumPy array, the array shares memory with this column.
+        """
+        return get_numpy().frombuffer(self.values, self.typecode).view(self.dtype)
+
+    def find_out_of_range(self, validator):
+        """
+        Find the indexes of values that fail a ``MinValueValidator`` or ``MaxValueValidator``, the whole column is
+        checked at once rather than value by value. Nulls are stored as zero so may be reported.
+        """
+        return find_limit_failures(validator, self.values, self.to_storage(validator.limit_value))
+
+    def validate(self):
+        field = self.field
+        errors = {}
+        if not field.null:
+            for idx in self.nulls:
+                errors[idx] = [field.error_messages['null']]
+
+        validators = field.validators
+        if field.choices or any(type(v) not in (MinValueValidator, MaxValueValidator) for v in validators):
+            candidates = range(len(self.values))
+        else:
+            candidates = set()
+            for validator in validators:
+                candidates.update(self.find_out_of_range(validator))
+
+        for idx in candidates:
+            if idx in self.nulls:
+                continue
+            messages = self._validate_value(self.from_storage(self.values[idx]))
+            if messages:
+                errors[idx] = messages
+        return errors
+
+
+def create_column(field):
+    """
+    Create an empty column suitable for storing values of a field.
+    """
+    for field_type, typecode, dtype in COLUMN_TYPES:
+        if isinstance(field, field_type):
+            return TypedColumn(field, typecode, dtype)
+    return Column(field)
+
+
+class RowView(object):
+    """
+    View of a single row of a ``ResourceArray`` that behaves like a resource; attributes are read from and written to
+    the columns of the array.
+
+    Methods and properties of the resource type can be used with a view, methods are called with the view as ``self``.
+    A view is not an instance of the resource type so methods that rely on this (eg that call ``super()``) must be
+    called on a resource created by ``to_resource``.
+    """
+    __slots__ = ('_array', '_index')
+
+    def __init__(self, resource_array, index):
+        object.__setattr__(self, '_array', resource_array)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name):
+        resource_array = self._array
+        column = resource_array.columns.get(name)
+        if column is not None:
+            return column.get(self._index)
+        resource_type = resource_array.resource_type
+        for klass in resource_type.__mro__:
+            if name in klass.__dict__:
+                value = klass.__dict__[name]
+                break
+        else:
+            raise AttributeError("'%s' object has no attribute '%s'" % (resource_type.__name__, name))
+        if isinstance(value, types.FunctionType):
+            return six.create_bound_method(value, self)
+        if isinstance(value, property):
+            return value.__get__(self)
+        # Static and class methods, class attributes etc.
+        return getattr(resource_type, name)
+
+    def __setattr__(self, name, value):
+        if name not in self._array.columns:
+            raise AttributeError("'%s' is not a field of %s." % (name, self._array.resource_type.__name__))
+        self._array.set_value(self._index, name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, RowView) and other._array is self._array and other._index == self._index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '<%s: %s row %d>' % (self.__class__.__name__, self._array.resource_type.__name__, self._index)
+
+    def to_resource(self):
+        """
+        Create a resource from the values of this row.
+        """
+        return self._array.get_resource(self._index)
+
+
+class ResourceArray(object):
+    """
+    Array of resources of a single type stored as a column per field.
+
+    Resources are added with ``append``/``extend`` or decoded directly into columns with ``from_dicts``. Indexing or
+    iterating the array returns ``RowView`` objects.
+    """
+    def __init__(self, resource_type, resources=None):
+        self.resource_type = resource_type
+        self.fields = resource_type._meta.fields
+        self.columns = dict((f.attname, create_column(f)) for f in self.fields)
+        self._length = 0
+        if resources is not None:
+            self.extend(resources)
+
+    @classmethod
+    def from_dicts(cls, resource_type, objs, trusted=False):
+        """
+        Build an array from decoded JSON objects (eg the elements of a JSON array) without creating a resource for each
+        object. Values are converted by each field and then validated a column at a time.
+
+        :param resource_type: The resource type of all objects.
+        :param objs: Iterable of dicts.
+        :param trusted: The objects are from a trusted source, values are converted but not validated.
+        :raises ValidationError: Errors keyed by the index of the object.
+        """
+        resource_array = cls(resource_type)
+        resource_name = resource_type._meta.resource_name
+        fields = resource_array.fields
+        errors = {}
+
+        for idx, obj in enumerate(objs):
+            document_resource_name = obj.get('$', resource_name)
+            if document_resource_name != resource_name:
+                errors[str(idx)] = ["Expected resource `%s` found `%s`." % (resource_name, document_resource_name)]
+                continue
+
+            row = []
+            row_errors = {}
+            for f in fields:
+                try:
+                    value = obj[f.name] if f.name in obj else f.get_default() if f.use_default_if_not_provided else None
+                    row.append(f.to_python_trusted(value) if trusted else f.to_python(value))
+                except ValidationError as ve:
+                    row_errors[f.name] = ve.error_messages
+            if row_errors:
+                errors[str(idx)] = row_errors
+            elif not errors:
+                resource_array._append_row(row)
+
+        if errors:
+            raise ValidationError(errors)
+        if not trusted:
+            resource_array.full_clean()
+        return resource_array
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("ResourceArray index out of range")
+        return RowView(self, idx)
+
+    def __iter__(self):
+        for idx in range(self._length):
+            yield RowView(self, idx)
+
+    def _replace_column(self, attname):
+        # Value could not be stored in a typed array.
+        column = self.columns[attname]
+        self.columns[attname] = new_column = Column(column.field, column.to_list())
+        return new_column
+
+    def _append_row(self, values):
+        for f, value in zip(self.fields, values):
+            try:
+                self.columns[f.attname].append(value)
+            except (TypeError, OverflowError):
+                self._replace_column(f.attname).append(value)
+        self._length += 1
+
+    def append(self, resource):
+        """
+        Append a resource, the resource must be of exactly the resource type of the array.
+        """
+        if type(resource) is not self.resource_type:
+            raise TypeError("Expected a %s resource." % self.resource_type.__name__)
+        self._append_row([f.value_from_object(resource) for f in self.fields])
+
+    def extend(self, resources):
+        for resource in resources:
+            self.append(resource)
+
+    def set_value(self, idx, attname, value):
+        """
+        Set the value of a field for a row.
+        """
+        try:
+            self.columns[attname].set(idx, value)
+        except (TypeError, OverflowError):
+            self._replace_column(attname).set(idx, value)
+
+    def column(self, attname):
+        """
+        Get the values of a field as a list.
+        """
+        return self.columns[attname].to_list()
+
+    def get_resource(self, idx):
+        """
+        Create a resource from the values of a row.
+        """
+        return self.resource_type._meta.restorer(tuple(self.columns[f.attname].get(idx) for f in self.fields))
+
+    def to_resources(self):
+        """
+        Create a list of resources from the array.
+        """
+        return [self.get_resource(idx) for idx in range(self._length)]
+
+    def full_clean(self):
+        """
+        Validate all values a column at a time (see ``TypedColumn.validate``) followed by the resource level ``clean``
+        of each row if the resource type defines one (called on a resource created from the row).
+
+        :raises ValidationError: Errors keyed by row index.
+        """
+        errors = {}
+        for f in self.fields:
+            for idx, messages in six.iteritems(self.columns[f.attname].validate()):
+                errors.setdefault(str(idx), {})[f.name] = messages
+
+        if six.get_unbound_function(self.resource_type.clean) is not six.get_unbound_function(Resource.clean):
+            for idx in range(self._length):
+                try:
+                    self.get_resource(idx).clean()
+                except ValidationError as ve:
+                    errors[str(idx)] = ve.update_error_dict(errors.get(str(idx), {}))
+
+        if errors:
+            raise ValidationError(errors)
+
+    def to_numpy(self):
+        """
+        Export the array as a NumPy structured array with a field per resource field. Null values of typed columns
+        are exported as zero (``NaT`` for date times).
+        """
+        numpy = get_numpy()
+        if numpy is None:
+            raise ImportError("NumPy is required to export a ResourceArray.")
+        columns = [self.columns[f.attname] for f in self.fields]
+        result = numpy.zeros(self._length, dtype=[(f.attname, c.dtype) for f, c in zip(self.fields, columns)])
+        for f, column in zip(self.fields, columns):
+            if isinstance(column, TypedColumn):
+                result[f.attname] = column.to_numpy()
+                if column.is_datetime and column.nulls:
+                    result[f.attname][sorted(column.nulls)] = numpy.datetime64('NaT')
+            else:
+                result[f.attname] = column.values
+        return result
@@ -7,16 +7,26 @@ from jsrn.resources import create_resource_from_dict
 
 
 class ResourceReader(csv.DictReader):
+    """
+    Reader that creates a resource from each row of a CSV file.
+
+    Accepts the same arguments as ``csv.DictReader`` along with the resource type. Additional keyword arguments:
+
+    ``trusted`` the file is from a trusted source, values will be converted but not validated.
+    ``only`` a list of field attribute names, only these fields are decoded.
+    """
     def __init__(self, f, resources, *args, **kwargs):
         self.resources = resources
+        self.trusted = kwargs.pop('trusted', False)
+        self.only = kwargs.pop('only', None)
         csv.DictReader.__init__(self, f, *args, **kwargs)
 
     # Python 2.6
     def next(self):
         d = csv.DictReader.next(self)
-        return create_resource_from_dict(d, self.resources._meta.resource_name)
+        return create_resource_from_dict(d, self.resources._meta.resource_name, self.trusted, only=self.only)
 
     # Python 3
     def __next__(self):
         d = csv.DictReader.__next__(self)
-        return create_resource_from_dict(d, self.resources._meta.resource_name)
+        return create_resource_from_dict(d, self.resources._meta.resource_name, self.trusted, only=self.only)
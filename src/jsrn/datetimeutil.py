@@ -8,6 +8,8 @@ ZERO = datetime.timedelta(0)
 STD_OFFSET = datetime.timedelta(seconds=-time.timezone)
 DST_OFFSET = datetime.timedelta(seconds=-time.altzone) if time.daylight else STD_OFFSET
 DST_DIFF = DST_OFFSET - STD_OFFSET
+# Maximum number of quarter hours cached by ``LocalTimezone``.
+DST_CACHE_SIZE = 100000
 
 
 class UTC(datetime.tzinfo):
@@ -33,7 +35,13 @@ class UTC(datetime.tzinfo):
 class LocalTimezone(datetime.tzinfo):
     """
     The current local timezone (according to the platform)
+
+    Whether daylight saving is in effect is looked up once per quarter hour and cached; this assumes DST transitions
+    occur on a quarter hour (in UTC and local time), which allows for zones with half hour offsets.
     """
+    _dst_cache = {}
+    _utc_dst_cache = {}
+
     def utcoffset(self, dt):
         if self._is_dst(dt):
             return DST_OFFSET
@@ -50,9 +58,29 @@ class LocalTimezone(datetime.tzinfo):
         return time.tzname[self._is_dst(dt)]
 
     def _is_dst(self, dt):
-        stamp = time.mktime((dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday(), 0, 0))
+        minute = dt.minute - dt.minute % 15
+        key = (dt.year, dt.month, dt.day, dt.hour, minute)
+        try:
+            return self._dst_cache[key]
+        except KeyError:
+            pass
+        stamp = time.mktime((dt.year, dt.month, dt.day, dt.hour, minute, 0, dt.weekday(), 0, 0))
         tt = time.localtime(stamp)
-        return tt.tm_isdst > 0
+        if len(self._dst_cache) >= DST_CACHE_SIZE:
+            self._dst_cache.clear()
+        is_dst = self._dst_cache[key] = tt.tm_isdst > 0
+        return is_dst
+
+    def fromutc(self, dt):
+        # Unlike a local time, a UTC time is never ambiguous; convert using the DST state of the UTC quarter hour.
+        quarter = ((dt.toordinal() - EPOCH_ORDINAL) * 24 + dt.hour) * 4 + dt.minute // 15
+        try:
+            is_dst = self._utc_dst_cache[quarter]
+        except KeyError:
+            if len(self._utc_dst_cache) >= DST_CACHE_SIZE:
+                self._utc_dst_cache.clear()
+            is_dst = self._utc_dst_cache[quarter] = time.localtime(quarter * 900).tm_isdst > 0
+        return dt + (DST_OFFSET if is_dst else STD_OFFSET)
 
     def __str__(self):
         return time.tzname[0]
@@ -63,6 +91,9 @@ class LocalTimezone(datetime.tzinfo):
 utc = UTC()
 local = LocalTimezone()
 
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=utc)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
 
 def get_tz_aware_dt(dt, assumed_tz=local):
     """
@@ -82,6 +113,14 @@ def get_tz_aware_dt(dt, assumed_tz=local):
 ECMA_ISO_DATE_STRING_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})\.(\d{3})Z$")
 
 
+def _parse_ecma_date_string(date_string):
+    match = ECMA_ISO_DATE_STRING_RE.match(date_string)
+    if not match:
+        raise ValueError("Expected ECMA 262 formatted date string.")
+    year, month, day, hour, minute, second, millisecond = map(int, match.groups())
+    return datetime.datetime(year, month, day, hour, minute, second, millisecond * 1000, utc)
+
+
 def parse_ecma_date_string(date_string, to_local_time=True):
     """
     Parse a date in the string format defined in ECMA-262.
@@ -93,27 +132,55 @@ def parse_ecma_date_string(date_string, to_local_time=True):
     if not isinstance(date_string, six.string_types):
         raise ValueError("Expected string")
 
-    match = ECMA_ISO_DATE_STRING_RE.match(date_string)
-    if not match:
-        raise ValueError("Expected ECMA 262 formatted date string.")
-
-    dtt = (
-        int(match.group(1)),  # Year
-        int(match.group(2)),  # Month
-        int(match.group(3)),  # Day
-        int(match.group(4)),  # Hour
-        int(match.group(5)),  # Minute
-        int(match.group(6)),  # Second
-        int(match.group(7))*1000,  # Microsecond
-        utc  # Timezone
-    )
-    dt = datetime.datetime(*dtt)
+    dt = _parse_ecma_date_string(date_string)
     if to_local_time:
-        return dt.astimezone(local)
+        return local.fromutc(dt.replace(tzinfo=local))
     else:
         return dt
 
 
+def parse_ecma_date_strings(date_strings, to_local_time=True):
+    """
+    Parse a sequence of dates in the string format defined in ECMA-262 (see ``parse_ecma_date_string``).
+
+    :returns: List of datetimes.
+    :raises ValueError: Any of the strings is not a valid date.
+    """
+    parse = _parse_ecma_date_string
+    try:
+        values = [parse(s) for s in date_strings]
+    except TypeError:
+        # Value is not a string.
+        raise ValueError("Expected string")
+    if to_local_time:
+        fromutc = local.fromutc
+        return [fromutc(dt.replace(tzinfo=local)) for dt in values]
+    return values
+
+
+def to_epoch_ms(dt, assume_local_time=True):
+    """
+    Convert a python datetime into milliseconds since the Unix epoch.
+
+    ``assume_local_time`` if true will assume the date time is in local time if the object is a naive date time object;
+        else assumes the time value is utc.
+    """
+    delta = get_tz_aware_dt(dt, local if assume_local_time else utc) - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def from_epoch_ms(value, to_local_time=True):
+    """
+    Convert milliseconds since the Unix epoch into a python datetime.
+
+    ``to_local_time`` option will return the datetime in the current local timezone.
+    """
+    dt = EPOCH + datetime.timedelta(milliseconds=value)
+    if to_local_time:
+        return local.fromutc(dt.replace(tzinfo=local))
+    return dt
+
+
 def to_ecma_date_string(dt, assume_local_time=True):
     """
     Convert a python datetime into the string format defined in ECMA-262.
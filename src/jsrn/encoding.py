@@ -3,7 +3,11 @@ try:
     import simplejson as json
 except ImportError:
     import json
-from jsrn import resources
+import six
+from jsrn import columns, exceptions, resources
+
+# Values of these types are JSON values as is.
+JSON_SCALAR_TYPES = frozenset(six.string_types + six.integer_types + (float, bool, type(None), six.text_type))
 
 
 class JSRNEncoder(json.JSONEncoder):
@@ -12,23 +16,75 @@ class JSRNEncoder(json.JSONEncoder):
     """
     def default(self, o):
         if isinstance(o, resources.Resource):
-            obj = {f.name: f.to_json(f.value_from_object(o)) for f in o._meta.fields}
-            obj[resources.RESOURCE_TYPE_FIELD] = o._meta.resource_name
-            return obj
-        return super(JSRNEncoder, self)
+            return o._meta.encoder(o)
+        if isinstance(o, columns.RowView):
+            return o._meta.encoder(o)
+        if isinstance(o, columns.ResourceArray):
+            return list(o)
+        return super(JSRNEncoder, self).default(o)
+
 
+def to_json_value(o):
+    """
+    Convert resources within a value into JSON values (dicts and lists) so the value can be serialised by any JSON
+    library without a ``default`` hook. Containers that do not contain resources are returned as is, other containers
+    are copied.
 
-def build_object_graph(obj, resource_name=None):
+    Values of types that are not understood are returned as is (the JSON library reports any error).
+    """
+    value_type = type(o)
+    if value_type in JSON_SCALAR_TYPES:
+        return o
+    if value_type is list or value_type is tuple:
+        return [v if type(v) in JSON_SCALAR_TYPES else to_json_value(v) for v in o]
+    if value_type is dict:
+        for v in six.itervalues(o):
+            if type(v) not in JSON_SCALAR_TYPES:
+                return dict((k, to_json_value(v)) for k, v in six.iteritems(o))
+        return o
+    meta = getattr(value_type, '_meta', None)
+    if isinstance(meta, resources.ResourceOptions):
+        return meta.json_encoder(o)
+    if value_type is columns.RowView:
+        return o._meta.json_encoder(o)
+    if value_type is columns.ResourceArray:
+        return list(map(o.resource_type._meta.json_encoder, o))
+    # Sub-classes of containers
+    if isinstance(o, (list, tuple)):
+        return [to_json_value(v) for v in o]
+    if isinstance(o, dict):
+        return dict((k, to_json_value(v)) for k, v in six.iteritems(o))
+    return o
+
+
+def build_object_graph(obj, resource_name=None, trusted=False, lazy=False, only=None, errors=None):
     """
     From the decoded JSON structure, generate an object graph.
 
+    :param obj: The decoded JSON structure.
+    :param resource_name: The name of the expected resource type.
+    :param trusted: The structure is from a trusted source; values are converted but not validated.
+    :param lazy: Convert and validate fields of resources on first access.
+    :param only: Only decode the fields selected by a list of field paths.
+    :param errors: Dict that errors are recorded into rather than raising ``ValidationError``, errors of elements of a
+        list are keyed by index. Invalid resources are returned as ``None``. A ``FailFastErrors`` dict raises a
+        ``ValidationError`` for the first error.
     :raises ValidationError: During building of the object graph and issues discovered are raised as a ValidationError.
     """
 
     if isinstance(obj, dict):
-        return resources.create_resource_from_dict(obj, resource_name)
+        return resources.create_resource_from_dict(obj, resource_name, trusted, lazy, only, errors)
 
     if isinstance(obj, list):
-        return [build_object_graph(o, resource_name) for o in obj]
+        if errors is None:
+            return [build_object_graph(o, resource_name, trusted, lazy, only) for o in obj]
+
+        values = []
+        for idx, o in enumerate(obj):
+            item_errors = exceptions.child_errors(errors, str(idx))
+            values.append(build_object_graph(o, resource_name, trusted, lazy, only, item_errors))
+            if item_errors:
+                errors[str(idx)] = item_errors
+        return values
 
     return obj
@@ -51,3 +51,79 @@ class ValidationError(Exception):
         else:
             error_dict[NON_FIELD_ERRORS] = self.messages
         return error_dict
+
+
+class ValidationResult(object):
+    """
+    Result of validating a document without raising a ``ValidationError``.
+    """
+    def __init__(self, value, errors):
+        """
+        :param value: The resource (or list of resources) if the document is valid, else ``None``.
+        :param errors: Dict of error messages; empty if the document is valid.
+        """
+        self.value = value
+        self.errors = errors
+
+    def __repr__(self):
+        if self.is_valid:
+            return 'ValidationResult(%r)' % self.value
+        return 'ValidationResult(errors=%r)' % self.errors
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def raise_for_errors(self):
+        """
+        Raise a ``ValidationError`` if the document is not valid.
+        """
+        if self.errors:
+            raise ValidationError(self.errors)
+
+
+class FailFastErrors(dict):
+    """
+    Dict of errors for fail fast validation; rather than recording an error a ``ValidationError`` is raised for the
+    first error. The error dict of the raised exception only contains the path to that error, the path is also
+    available as a tuple of keys from the ``path`` attribute of the exception.
+    """
+    def __init__(self, path=()):
+        super(FailFastErrors, self).__init__()
+        self.path = path
+
+    def child(self, key):
+        """
+        Get the errors dict for a child value (eg a child resource or an element of a list).
+        """
+        return FailFastErrors(self.path + (key,))
+
+    def __setitem__(self, key, messages):
+        path = self.path + (key,)
+        # Reduce nested errors (eg from a child resource) to the first error.
+        while True:
+            if isinstance(messages, list) and len(messages) == 1 and isinstance(messages[0], dict):
+                messages = messages[0]
+            if not (isinstance(messages, dict) and messages):
+                break
+            key = next(iter(messages))
+            path += (key,)
+            messages = messages[key]
+
+        error_dict = messages
+        for key in reversed(path):
+            error_dict = {key: error_dict}
+        ve = ValidationError(error_dict)
+        ve.path = path
+        raise ve
+
+    def update(self, *args, **kwargs):
+        for key, messages in dict(*args, **kwargs).items():
+            self[key] = messages
+
+
+def child_errors(errors, key):
+    """
+    Get a dict to record the errors of a child value into, errors are then recorded into ``errors`` under ``key``.
+    """
+    return errors.child(key) if isinstance(errors, FailFastErrors) else {}
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import array
 import copy
 import datetime
 import six
 from jsrn import exceptions, datetimeutil
-from jsrn.validators import EMPTY_VALUES, MaxLengthValidator, MinValueValidator, MaxValueValidator
+from jsrn.validators import EMPTY_VALUES, MaxLengthValidator, MinValueValidator, MaxValueValidator, \
+    compile_validator, find_limit_failures
+from jsrn.utils import get_numpy
 
 __all__ = ('BooleanField', 'StringField', 'IntegerField', 'FloatField', 'ObjectField', 'ArrayField')
 
@@ -49,12 +52,31 @@ class Field(object):
         self.help_text = help_text
         self.validators = self.default_validators + validators
 
-        messages = {}
-        for c in reversed(self.__class__.__mro__):
-            messages.update(getattr(c, 'default_error_messages', {}))
-        messages.update(error_messages or {})
+        messages = dict(self.get_default_error_messages())
+        if error_messages:
+            messages.update(error_messages)
         self.error_messages = messages
 
+    @classmethod
+    def get_default_error_messages(cls):
+        """
+        Default error messages of this field class merged with those of all base classes, the merged dict is cached
+        on the class so must not be modified.
+        """
+        messages = cls.__dict__.get('_default_error_messages')
+        if messages is None:
+            messages = {}
+            for c in reversed(cls.__mro__):
+                messages.update(getattr(c, 'default_error_messages', {}))
+            cls._default_error_messages = messages
+        return messages
+
+    def __copy__(self):
+        # Avoids the generic (reduce based) copy protocol, fields are copied for every sub-class of a resource.
+        obj = object.__new__(type(self))
+        obj.__dict__.update(self.__dict__)
+        return obj
+
     def __deepcopy__(self, memodict):
         # We don't have to deepcopy very much here, since most things are not
         # intended to be altered after initial creation.
@@ -94,8 +116,120 @@ class Field(object):
         """
         return value
 
+    def to_python_trusted(self, value):
+        """
+        Converts a value from a trusted source (eg a document previously produced by JSRN) into the expected Python
+        data type. No validation is performed. By default this is the same as ``to_python``.
+        """
+        return self.to_python(value)
+
+    @property
+    def choice_values(self):
+        """
+        Frozenset of valid choice values (or ``None`` if the values are not hashable), rebuilt if ``choices`` is
+        replaced.
+        """
+        choices = self.choices
+        index = self.__dict__.get('_choice_index')
+        if index is None or index[0] is not choices:
+            try:
+                values = frozenset(choice[0] for choice in choices or ())
+            except TypeError:
+                values = None
+            self._choice_index = index = (choices, values)
+        return index[1]
+
+    def is_valid_choice(self, value):
+        """
+        Check if a value is one of the choices of this field.
+        """
+        choice_values = self.choice_values
+        if choice_values is not None:
+            try:
+                return value in choice_values
+            except TypeError:
+                # Value is not hashable
+                pass
+        for choice in self.choices:
+            if value == choice[0]:
+                return True
+        return False
+
+    def compile_check(self):
+        """
+        Compile a callable that converts and validates a value like ``clean`` but records errors rather than raising
+        ``ValidationError``.
+
+        The callable accepts the value, a dict of errors and the key to record any errors under; it returns the
+        converted value (or ``None`` if the value is invalid). Null values, choices and limit validators are checked
+        without raising exceptions (see ``validators.compile_validator``); errors raised by ``to_python`` or methods
+        overridden by a sub-class are caught. Changes to the options of the field after compiling are not reflected by
+        the callable.
+        """
+        def overridden(method_name):
+            return getattr(type(self), method_name) is not getattr(Field, method_name)
+
+        ValidationError = exceptions.ValidationError
+        if overridden('clean'):
+            clean = self.clean
+
+            def check_clean(value, errors, key):
+                try:
+                    return clean(value)
+                except ValidationError as ve:
+                    errors[key] = ve.error_messages
+            return check_clean
+
+        default = self.get_default if self.use_default_if_not_provided else lambda: None
+        to_python = self.to_python
+        validate = self.validate if overridden('validate') else None
+        run_validators = self.run_validators if overridden('run_validators') else None
+        validators = tuple(compile_validator(v, self.error_messages) for v in self.validators)
+        is_valid_choice = self.is_valid_choice if self.choices else None
+        null = self.null
+        error_messages = self.error_messages
+
+        def check(value, errors, key):
+            if value is NOT_PROVIDED:
+                value = default()
+            try:
+                value = to_python(value)
+                if validate is not None:
+                    validate(value)
+            except ValidationError as ve:
+                errors[key] = ve.error_messages
+                return None
+
+            if validate is None:
+                # Checks of the default validate (an overridden validate has been called above).
+                if value is None:
+                    if not null:
+                        errors[key] = [error_messages['null']]
+                        return None
+                elif is_valid_choice is not None and value not in EMPTY_VALUES and not is_valid_choice(value):
+                    errors[key] = [error_messages['invalid_choice'] % value]
+                    return None
+
+            if run_validators is not None:
+                try:
+                    run_validators(value)
+                except ValidationError as ve:
+                    errors[key] = ve.error_messages
+                    return None
+            elif validators and value not in EMPTY_VALUES:
+                messages = None
+                for validator in validators:
+                    validator_messages = validator(value)
+                    if validator_messages:
+                        messages = (messages or []) + validator_messages
+                if messages:
+                    errors[key] = messages
+                    return None
+            return value
+        return check
+
     def run_validators(self, value):
-        if value in EMPTY_VALUES:
+        if not self.validators or value in EMPTY_VALUES:
             return
 
         errors = []
@@ -115,9 +249,8 @@ class Field(object):
 
     def validate(self, value):
         if self.choices and value not in EMPTY_VALUES:
-            for choice in self.choices:
-                if value == choice[0]:
-                    return
+            if self.is_valid_choice(value):
+                return
             msg = self.error_messages['invalid_choice'] % value
             raise exceptions.ValidationError(msg)
 
@@ -257,9 +390,16 @@ class DateTimeField(Field):
         'invalid': "Not a valid date string.",
     }
 
-    def __init__(self, assume_local=True, *arg, **kwargs):
+    def __init__(self, assume_local=True, epoch_ms=False, *arg, **kwargs):
+        """
+        :param assume_local: Naive date times are in the local timezone and decoded date times are converted to the
+            local timezone.
+        :param epoch_ms: Encode date times as milliseconds since the Unix epoch rather than a string, decoding accepts
+            either form.
+        """
         super(DateTimeField, self).__init__(*arg, **kwargs)
         self.assume_local = assume_local
+        self.epoch_ms = epoch_ms
 
     def to_python(self, value):
         if value is None:
@@ -267,17 +407,33 @@ class DateTimeField(Field):
         if isinstance(value, datetime.datetime):
             return value
         try:
+            if self.epoch_ms and isinstance(value, six.integer_types + (float, )) and not isinstance(value, bool):
+                return datetimeutil.from_epoch_ms(value, self.assume_local)
             return datetimeutil.parse_ecma_date_string(value, self.assume_local)
-        except ValueError:
+        except (ValueError, OverflowError):
             pass
         msg = self.error_messages['invalid']
         raise exceptions.ValidationError(msg)
 
+    def to_python_many(self, values):
+        """
+        Convert a list of date strings in a single batch.
+
+        :raises ValidationError: Any value is not a valid date string (use ``to_python`` to identify the value).
+        """
+        try:
+            return datetimeutil.parse_ecma_date_strings(values, self.assume_local)
+        except ValueError:
+            raise exceptions.ValidationError(self.error_messages['invalid'])
+
     def to_json(self, value):
         if value is None:
             return None
         if isinstance(value, datetime.datetime):
-            datetimeutil.to_ecma_date_string(value, self.assume_local)
+            if self.epoch_ms:
+                return datetimeutil.to_epoch_ms(value, self.assume_local)
+            return datetimeutil.to_ecma_date_string(value, self.assume_local)
+        return value
 
 
 class ObjectField(Field):
@@ -322,24 +478,178 @@ class ArrayField(Field):
 
 
 class TypedArrayField(ArrayField):
-    def __init__(self, field, **kwargs):
+    """
+    Array where each entry is converted and validated by another field.
+
+    Arrays of ``IntegerField`` or ``FloatField`` entries can be stored as an ``array.array`` (``storage='array'``) or
+    a NumPy array (``storage='numpy'``) rather than a list. Values are converted in bulk and entry level min/max
+    validators are checked against the whole array.
+    """
+    default_error_messages = {
+        'invalid_item': "Value cannot be stored in a typed array.",
+    }
+    # Array type codes of entry fields that support array storage.
+    storage_typecodes = (
+        (IntegerField, 'q'),
+        (FloatField, 'd'),
+    )
+
+    def __init__(self, field, storage=None, **kwargs):
         self.field = field
+        self.storage = storage
+        self.typecode = None
+        if storage in ('array', 'numpy'):
+            for field_type, typecode in self.storage_typecodes:
+                if isinstance(field, field_type):
+                    self.typecode = typecode
+                    break
+            else:
+                raise TypeError("Array storage is only supported for IntegerField and FloatField entries.")
+            if storage == 'numpy' and get_numpy() is None:
+                raise ImportError("NumPy is required for numpy storage.")
+        elif storage is not None:
+            raise ValueError("Unknown storage `%s`." % storage)
+        # Compiled on first use (see ``_validate_items``).
+        self._check_item = NOT_PROVIDED
         super(TypedArrayField, self).__init__(**kwargs)
 
+    def _to_array(self, value):
+        numpy = get_numpy(self.storage == 'numpy')
+        if numpy is not None and isinstance(value, numpy.ndarray) and value.dtype.kind in 'biuf':
+            value = value.astype(self.typecode, copy=False)
+            return value if self.storage == 'numpy' else array.array(self.typecode, value.tobytes())
+        if isinstance(value, array.array) and value.typecode == self.typecode:
+            values = value
+        else:
+            try:
+                # Converted in bulk, any value that is not a number falls back to conversion by the entry field.
+                values = array.array(self.typecode, value)
+            except (TypeError, OverflowError):
+                values = self._convert_items(super(TypedArrayField, self).to_python(value))
+        return numpy.frombuffer(values, self.typecode) if self.storage == 'numpy' else values
+
+    def _convert_items(self, value):
+        values = array.array(self.typecode) if self.typecode else []
+        errors = {}
+        for idx, item in enumerate(value):
+            try:
+                item = self.field.to_python(item)
+            except exceptions.ValidationError as ve:
+                errors[idx] = ve.error_messages
+                continue
+            if not self.typecode:
+                values.append(item)
+            elif item is None:
+                errors[idx] = [self.field.error_messages['null']]
+            else:
+                try:
+                    values.append(item)
+                except (TypeError, OverflowError):
+                    errors[idx] = [self.error_messages['invalid_item']]
+
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        return values
+
     def to_python(self, value):
+        if self.typecode and value is not None:
+            return self._to_array(value)
+
         value = super(TypedArrayField, self).to_python(value)
         if not value:
             return value
+        if hasattr(self.field, 'to_python_many'):
+            try:
+                return self.field.to_python_many(value)
+            except exceptions.ValidationError:
+                # Convert each value to identify the invalid values.
+                pass
+        return self._convert_items(value)
+
+    def _compile_item_check(self):
+        # Entries are already converted, so only validation of the entry field is required.
+        field = self.field
+        field_type = type(field)
+        overridden = field_type.validate is not Field.validate or field_type.run_validators is not Field.run_validators
+        if not (field.choices or field.validators or overridden):
+            # Nothing to check beyond null entries.
+            return None
+        if overridden:
+            validate = field.validate
+            run_validators = field.run_validators
+
+            def check_overridden(item, errors, key):
+                try:
+                    validate(item)
+                    run_validators(item)
+                except exceptions.ValidationError as ve:
+                    errors[key] = ve.error_messages
+            return check_overridden
+
+        validators = tuple(compile_validator(v, field.error_messages) for v in field.validators)
+        is_valid_choice = field.is_valid_choice if field.choices else None
+        null = field.null
+        error_messages = field.error_messages
+
+        def check_item(item, errors, key):
+            if item is None:
+                if not null:
+                    errors[key] = [error_messages['null']]
+                return
+            if is_valid_choice is not None and item not in EMPTY_VALUES and not is_valid_choice(item):
+                errors[key] = [error_messages['invalid_choice'] % item]
+                return
+            if item not in EMPTY_VALUES:
+                messages = None
+                for validator in validators:
+                    validator_messages = validator(item)
+                    if validator_messages:
+                        messages = (messages or []) + validator_messages
+                if messages:
+                    errors[key] = messages
+        return check_item
+
+    def _validate_items(self, value):
+        field = self.field
+        if self._check_item is NOT_PROVIDED:
+            self._check_item = self._compile_item_check()
+        check_item = self._check_item
+
+        if check_item is None:
+            # Typed storage cannot contain null entries.
+            if self.typecode or field.null or None not in value:
+                return {}
+            null_messages = [field.error_messages['null']]
+            return dict((idx, null_messages) for idx, item in enumerate(value) if item is None)
+
+        candidates = range(len(value))
+        if self.typecode and not field.choices and all(
+                type(v) in (MinValueValidator, MaxValueValidator) for v in field.validators):
+            candidates = set()
+            for validator in field.validators:
+                candidates.update(find_limit_failures(validator, value))
+            candidates = sorted(candidates)
 
-        value_list = []
         errors = {}
-        for idx, item in enumerate(value):
-            try:
-                value_list.append(self.field.to_python(item))
-            except exceptions.ValidationError as ve:
-                errors[idx] = ve.error_messages
+        for idx in candidates:
+            item = value[idx]
+            if self.storage == 'numpy':
+                item = item.item()
+            check_item(item, errors, idx)
+        return errors
 
+    def run_validators(self, value):
+        if value is None or not len(value):
+            return
+        if self.validators:
+            super(TypedArrayField, self).run_validators(list(value))
+
+        errors = self._validate_items(value)
         if errors:
             raise exceptions.ValidationError(errors)
 
-        return value_list
+    def to_json(self, value):
+        if self.typecode and hasattr(value, 'tolist'):
+            return value.tolist()
+        return value
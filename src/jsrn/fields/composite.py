@@ -1,6 +1,6 @@
 from jsrn import exceptions
-from jsrn.resources import create_resource_from_dict
-from jsrn.fields import Field
+from jsrn.resources import create_resource_from_dict, resolve_resource_type
+from jsrn.fields import Field, NOT_PROVIDED
 from jsrn.validators import EMPTY_VALUES
 
 __all__ = ('ObjectAs', 'ArrayOf',)
@@ -36,6 +36,121 @@ class ObjectAs(Field):
         if value not in EMPTY_VALUES:
             value.full_clean()
 
+    def to_python_trusted(self, value, only=None):
+        if isinstance(value, dict):
+            return create_resource_from_dict(value, self.of._meta.resource_name, trusted=True, only=only)
+        return value
+
+    def _conversion_overridden(self, base):
+        # A sub-class overrides conversion or validation, the single pass clean of ``base`` would skip the override.
+        return any(getattr(type(self), name) is not getattr(base, name) for name in ('to_python', 'validate'))
+
+    def _clean_resource(self, value, only=None):
+        if isinstance(value, dict):
+            # Resources created from a dict are validated as they are built.
+            return create_resource_from_dict(value, self.of._meta.resource_name, only=only)
+        value = ObjectAs.to_python(self, value)
+        if value is not None:
+            value.full_clean()
+        return value
+
+    def clean(self, value, only=None):
+        """
+        Convert and validate a resource.
+
+        Unlike ``to_python`` followed by ``validate`` each resource is only validated once, a resource decoded from a
+        dict is not cleaned a second time. The fields decoded can be selected with ``only`` (see
+        ``create_resource_from_dict``).
+        """
+        if self._conversion_overridden(ObjectAs):
+            return super(ObjectAs, self).clean(value)
+        if value is NOT_PROVIDED:
+            value = self.get_default() if self.use_default_if_not_provided else None
+        value = self._clean_resource(value, only)
+        super(ObjectAs, self).validate(value)
+        self.run_validators(value)
+        return value
+
+    def _compile_field_checks(self):
+        # Checks of the composite value itself (after the resource(s) have been cleaned).
+        choices_or_validators = bool(self.choices or self.validators)
+        null = self.null
+        null_message = self.error_messages['null']
+        field_validate = super(ObjectAs, self).validate
+        run_validators = self.run_validators
+
+        def check_value(value, errors, key):
+            if value is None and not null:
+                errors[key] = [null_message]
+                return False
+            if choices_or_validators:
+                try:
+                    field_validate(value)
+                    run_validators(value)
+                except exceptions.ValidationError as ve:
+                    errors[key] = ve.error_messages
+                    return False
+            return True
+        return check_value
+
+    def _compile_resource_check(self):
+        resource_name = self.of._meta.resource_name
+        clean_resource = self._clean_resource
+
+        def check_resource(value, errors, key, only=None):
+            """
+            Clean a single resource, errors are recorded under key. Returns ``None`` if the resource is not valid.
+            """
+            if isinstance(value, dict):
+                try:
+                    resource_type = resolve_resource_type(value, resource_name)
+                except exceptions.ValidationError as ve:
+                    errors[key] = ve.error_messages
+                    return None
+                resource_errors = exceptions.child_errors(errors, key)
+                value = resource_type._meta.get_decoder(only=only)(value, resource_errors)
+                if resource_errors:
+                    errors[key] = resource_errors
+                return value
+            try:
+                return clean_resource(value, only)
+            except exceptions.ValidationError as ve:
+                errors[key] = ve.error_messages
+        return check_resource
+
+    def compile_check(self):
+        """
+        Compile a callable that cleans a resource recording errors rather than raising ``ValidationError`` (see
+        ``Field.compile_check``). Errors of a child resource decoded from a dict are recorded without raising.
+        """
+        if type(self).clean is not ObjectAs.clean or self._conversion_overridden(ObjectAs):
+            return self._compile_clean_check()
+
+        default = self.get_default if self.use_default_if_not_provided else lambda: None
+        check_resource = self._compile_resource_check()
+        check_value = self._compile_field_checks()
+
+        def check(value, errors, key, only=None):
+            if value is NOT_PROVIDED:
+                value = default()
+            if value is not None:
+                value = check_resource(value, errors, key, only)
+                if key in errors:
+                    return None
+            return value if check_value(value, errors, key) else None
+        return check
+
+    def _compile_clean_check(self):
+        # Clean is overridden by a sub-class.
+        clean = self.clean
+
+        def check_clean(value, errors, key, only=None):
+            try:
+                return clean(value, only=only) if only else clean(value)
+            except exceptions.ValidationError as ve:
+                errors[key] = ve.error_messages
+        return check_clean
+
 
 class ArrayOf(ObjectAs):
     default_error_messages = {
@@ -83,3 +198,79 @@ class ArrayOf(ObjectAs):
         if value not in EMPTY_VALUES:
             super_validate = super(ArrayOf, self).validate
             self._process_list(value, super_validate)
+
+    def to_python_trusted(self, value, only=None):
+        if value is None:
+            return []
+        resource_name = self.of._meta.resource_name
+
+        values = []
+        for idx, v in enumerate(value):
+            if isinstance(v, dict):
+                try:
+                    v = create_resource_from_dict(v, resource_name, trusted=True, only=only)
+                except exceptions.ValidationError as ve:
+                    # Keyed by index like errors of untrusted data.
+                    raise exceptions.ValidationError({str(idx): ve.error_messages})
+            values.append(v)
+        return values
+
+    def clean(self, value, only=None):
+        """
+        Convert and validate a list of resources, each resource is only validated once.
+        """
+        if self._conversion_overridden(ArrayOf):
+            return super(ObjectAs, self).clean(value)
+        if value is NOT_PROVIDED:
+            value = self.get_default() if self.use_default_if_not_provided else None
+        if value is None:
+            value = []
+        if not isinstance(value, list):
+            msg = self.error_messages['invalid'] % self.of
+            raise exceptions.ValidationError(msg)
+
+        def process(val):
+            if val is None:
+                raise exceptions.ValidationError(self.error_messages['null'])
+            return self._clean_resource(val, only)
+
+        value = self._process_list(value, process)
+        super(ObjectAs, self).validate(value)
+        self.run_validators(value)
+        return value
+
+    def compile_check(self):
+        """
+        Compile a callable that cleans a list of resources recording errors rather than raising ``ValidationError``
+        (see ``Field.compile_check``), errors are keyed by index.
+        """
+        if type(self).clean is not ArrayOf.clean or self._conversion_overridden(ArrayOf):
+            return self._compile_clean_check()
+
+        default = self.get_default if self.use_default_if_not_provided else lambda: None
+        check_resource = self._compile_resource_check()
+        check_value = self._compile_field_checks()
+        invalid_message = self.error_messages['invalid'] % self.of
+        null_message = self.error_messages['null']
+
+        def check(value, errors, key, only=None):
+            if value is NOT_PROVIDED:
+                value = default()
+            if value is None:
+                value = []
+            if not isinstance(value, list):
+                errors[key] = [invalid_message]
+                return None
+
+            values = []
+            item_errors = exceptions.child_errors(errors, key)
+            for idx, item in enumerate(value):
+                if item is None:
+                    item_errors[str(idx)] = [null_message]
+                else:
+                    values.append(check_resource(item, item_errors, str(idx), only))
+            if item_errors:
+                errors[key] = item_errors
+                return None
+            return values if check_value(values, errors, key) else None
+        return check
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Decoding of large documents across a pool of processes.
+
+The input is split into chunks of elements, each chunk is decoded and validated by a worker process and the resources
+are returned (pickled) to the parent. Resource types must be registered in the worker processes, this is always the
+case when processes are forked, otherwise the modules that define resources must be imported by the workers.
+"""
+import itertools
+import multiprocessing
+from jsrn.backends import get_backend
+from jsrn.encoding import build_object_graph
+from jsrn.exceptions import ValidationError
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def decode_chunk(args):
+    """
+    Decode a chunk of elements, this is the function executed by worker processes.
+
+    :param args: Tuple of resource name, decoding options, if values need to be parsed and a list of ``(key, value)``
+        pairs where value is either a decoded JSON structure or a JSON string (if parsing is required).
+    :returns: Tuple of the list of resources and a dict of errors keyed by element key.
+    """
+    resource_name, trusted, only, parse, items = args
+    resources = []
+    errors = {}
+    parse_json = get_backend().loads
+    for key, value in items:
+        try:
+            if parse:
+                value = parse_json(value)
+            resources.append(build_object_graph(value, resource_name, trusted, only=only))
+        except ValidationError as ve:
+            errors[key] = ve.error_messages
+    return resources, errors
+
+
+def _chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def decode_items(items, parse=False, resource_name=None, trusted=False, only=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 workers=None, pool=None):
+    """
+    Decode items across a pool of processes.
+
+    :param items: Iterable of ``(key, value)`` pairs (see ``decode_chunk``), keys are used to report errors.
+    :param parse: Values are JSON strings that need to be parsed.
+    :param resource_name: Name of the expected resource type.
+    :param trusted: The items are from a trusted source, values are converted but not validated.
+    :param only: Only decode the fields selected by a list of field paths.
+    :param chunk_size: Number of items decoded by a worker at a time.
+    :param workers: Number of worker processes; default is the number of CPUs.
+    :param pool: An existing ``multiprocessing.Pool`` to use rather than creating a new pool.
+    :returns: List of resources in the same order as items.
+    :raises ValidationError: Errors for all invalid items keyed by item key.
+    """
+    chunks = ((resource_name, trusted, only, parse, chunk) for chunk in _chunks(items, chunk_size))
+    first_chunks = list(itertools.islice(chunks, 2))
+
+    if len(first_chunks) < 2:
+        # Not worth the overhead of sending to another process.
+        return _gather(decode_chunk(chunk) for chunk in first_chunks)
+
+    # Chunks are read from items as workers become free (rather than reading all items first) and results are
+    # gathered as they arrive.
+    chunks = itertools.chain(first_chunks, chunks)
+    if pool is not None:
+        return _gather(pool.imap(decode_chunk, chunks))
+    pool = multiprocessing.Pool(workers)
+    try:
+        return _gather(pool.imap(decode_chunk, chunks))
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _gather(results):
+    resources = []
+    errors = {}
+    for chunk_resources, chunk_errors in results:
+        resources.extend(chunk_resources)
+        errors.update(chunk_errors)
+    if errors:
+        raise ValidationError(errors)
+    return resources
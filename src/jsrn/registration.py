@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
+import six
 
 
 class ResourceCache(object):
     # Use the Borg pattern to share state between all instances. Details at
     # http://aspn.activestate.com/ASPN/Cookbook/Python/Recipe/66531.
     __shared_state = dict(
-        resources={}
+        resources={},
+        # Resolution index of resource names as they appear in documents (not lower cased) to resource types.
+        resolved={},
+        # Resource names of each resource type and all of its ancestors.
+        ancestors={},
     )
 
     def __init__(self):
@@ -15,13 +20,39 @@ class ResourceCache(object):
         """
         Iterate through registered resources.
         """
-        return self.resources.itervalues()
+        return six.itervalues(self.resources)
 
     def get_resource(self, resource_name):
         """
         Get a resource by name.
+
+        Names are case insensitive, names that have been resolved previously are found with a single lookup. Only names
+        of registered resources are added to the resolution index.
+        """
+        resource = self.resolved.get(resource_name)
+        if resource is None:
+            resource = self.resources.get(resource_name.lower())
+            if resource is not None:
+                self.resolved[resource_name] = resource
+        return resource
+
+    def get_ancestor_names(self, resource):
+        """
+        Get a frozenset of the resource names of a resource type and all of its ancestors (not just direct parents).
+        """
+        names = self.ancestors.get(resource)
+        if names is None:
+            names = set([resource._meta.resource_name])
+            for parent in resource._meta.parents:
+                names.update(self.get_ancestor_names(parent))
+            names = self.ancestors[resource] = frozenset(names)
+        return names
+
+    def is_sub_resource(self, resource, resource_name):
+        """
+        Check if a resource type is the resource named or is derived from it.
         """
-        return self.resources.get(resource_name.lower())
+        return resource_name in self.get_ancestor_names(resource)
 
     def register_resources(self, *resources):
         """
@@ -33,8 +64,11 @@ class ResourceCache(object):
                 continue
 
             self.resources[resource_name] = resource
+            self.get_ancestor_names(resource)
 
 cache = ResourceCache()
 
 get_resource = cache.get_resource
+get_ancestor_names = cache.get_ancestor_names
+is_sub_resource = cache.is_sub_resource
 register_resources = cache.register_resources
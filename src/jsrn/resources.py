@@ -3,11 +3,15 @@ import copy
 import six
 from jsrn import exceptions, registration
 from jsrn.exceptions import ValidationError
-from jsrn.fields import NOT_PROVIDED
+from jsrn.fields import Field, NOT_PROVIDED
 
 
 RESOURCE_TYPE_FIELD = '$'
-META_OPTION_NAMES = ('name', 'name_space', 'verbose_name', 'verbose_name_plural', 'abstract', 'doc_group', )
+META_OPTION_NAMES = ('name', 'name_space', 'verbose_name', 'verbose_name_plural', 'abstract', 'doc_group', 'slots', )
+COMPILED_CACHE_NAMES = ('_decoder', '_trusted_decoder', '_projected_decoders', '_encoder', '_reducer', '_restorer',
+                       '_binary_layout', '_schema_fingerprint', '_json_encoder', )
+# Cached state that depends on the fields of a resource.
+FIELD_CACHE_NAMES = frozenset(('_field_cache', '_name_map', '_checked_projections', ) + COMPILED_CACHE_NAMES)
 
 
 class ResourceOptions(object):
@@ -23,9 +27,11 @@ class ResourceOptions(object):
         self.verbose_name_plural = None
         self.abstract = False
         self.doc_group = None
+        self.slots = False
 
     def contribute_to_class(self, cls, name):
         cls._meta = self
+        self.resource = cls
         self.name = cls.__name__
 
         if self.meta:
@@ -51,11 +57,9 @@ class ResourceOptions(object):
 
     def add_field(self, field):
         self.fields.append(field)
-        if hasattr(self, '_field_cache'):
-            del self._field_cache
-
-        if hasattr(self, '_name_map'):
-            del self._name_map
+        # Checking the instance dict once is much cheaper than a hasattr per cache while a class is being built.
+        for cache_name in FIELD_CACHE_NAMES.intersection(self.__dict__):
+            delattr(self, cache_name)
 
     def add_virtual_field(self, field):
         self.virtual_fields.append(field)
@@ -79,6 +83,122 @@ class ResourceOptions(object):
             self._parent_resource_names = [p._meta.resource_name for p in self.parents]
         return self._parent_resource_names
 
+    @property
+    def decoder(self):
+        """
+        Decoder function compiled for this resource.
+
+        The function accepts a dict of field values (without a resource type field) and returns a validated resource.
+        If a dict of errors is also supplied, errors are recorded into it rather than raising ``ValidationError`` and
+        ``None`` is returned for an invalid resource.
+        """
+        if not hasattr(self, '_decoder'):
+            from jsrn.codegen import compile_decoder
+            self._decoder = compile_decoder(self.resource)
+        return self._decoder
+
+    @property
+    def trusted_decoder(self):
+        """
+        Decoder function compiled for this resource for use with trusted data.
+
+        Values are converted to the expected type but no validation is performed.
+        """
+        if not hasattr(self, '_trusted_decoder'):
+            from jsrn.codegen import compile_decoder
+            self._trusted_decoder = compile_decoder(self.resource, trusted=True)
+        return self._trusted_decoder
+
+    def check_projection(self, only):
+        """
+        Check that each path of a projection (see ``parse_projection``) selects a field of this resource or of a
+        sub-resource, and that dotted paths only select fields of child resources of composite fields.
+
+        :raises ValueError: A path does not select a field.
+        """
+        key = frozenset(only)
+        checked = self.__dict__.setdefault('_checked_projections', set())
+        if key in checked:
+            return
+
+        resource_types = [self.resource]
+        for resource_type in resource_types:
+            resource_types.extend(resource_type.__subclasses__())
+        for name, child_paths in six.iteritems(parse_projection(only)):
+            fields = [f for resource_type in resource_types for f in resource_type._meta.fields if f.attname == name]
+            if not fields:
+                raise ValueError("`%s` is not a field of %s." % (name, self.resource.__name__))
+            if child_paths:
+                composite_fields = [f for f in fields if hasattr(f, 'of')]
+                if not composite_fields:
+                    raise ValueError("`%s` of %s is not a composite field, `%s.%s` cannot be selected." % (
+                        name, self.resource.__name__, name, child_paths[0]))
+                composite_fields[0].of._meta.check_projection(child_paths)
+        checked.add(key)
+
+    def get_decoder(self, trusted=False, only=None):
+        """
+        Get a compiled decoder function for this resource.
+
+        :param trusted: Decoder for trusted data.
+        :param only: Decoder that only decodes the fields selected by a list of field paths (see ``parse_projection``).
+        """
+        if only is None:
+            return self.trusted_decoder if trusted else self.decoder
+
+        key = (trusted, frozenset(only))
+        if not hasattr(self, '_projected_decoders'):
+            self._projected_decoders = {}
+        if key not in self._projected_decoders:
+            from jsrn.codegen import compile_decoder
+            self._projected_decoders[key] = compile_decoder(self.resource, trusted, parse_projection(only))
+        return self._projected_decoders[key]
+
+    @property
+    def encoder(self):
+        """
+        Encoder function compiled for this resource.
+
+        The function accepts a resource and returns a dict of JSON values (including the resource type field).
+        """
+        if not hasattr(self, '_encoder'):
+            from jsrn.codegen import compile_encoder
+            self._encoder = compile_encoder(self.resource)
+        return self._encoder
+
+    @property
+    def json_encoder(self):
+        """
+        Encoder function compiled for this resource that also converts values of child resources.
+
+        The function accepts a resource and returns a dict that only contains JSON values, ready for serialisation by
+        any JSON library (see ``encoding.to_json_value``).
+        """
+        if not hasattr(self, '_json_encoder'):
+            from jsrn.codegen import compile_encoder
+            self._json_encoder = compile_encoder(self.resource, walk=True)
+        return self._json_encoder
+
+    @property
+    def reducer(self):
+        """
+        Function compiled for this resource that implements ``__reduce__`` (used for pickling and copying).
+        """
+        if not hasattr(self, '_reducer'):
+            from jsrn.codegen import compile_reducer
+            self._reducer = compile_reducer(self.resource)
+        return self._reducer
+
+    @property
+    def restorer(self):
+        """
+        Function compiled for this resource that restores a resource from a tuple of field values.
+        """
+        if not hasattr(self, '_restorer'):
+            from jsrn.codegen import compile_restorer
+            self._restorer = compile_restorer(self.resource)
+        return self._restorer
+
     def __repr__(self):
         return '<Options for %s>' % self.resource_name
 
@@ -103,7 +223,18 @@ class ResourceBase(type):
 
         # Create the class.
         module = attrs.pop('__module__')
-        new_class = super_new(cls, name, bases, {'__module__': module})
+        new_attrs = {'__module__': module}
+        # Python 3 requires the class cell used by super() to be supplied at creation.
+        classcell = attrs.pop('__classcell__', None)
+        if classcell is not None:
+            new_attrs['__classcell__'] = classcell
+        # Slots must be defined when the class is created.
+        slots = getattr(attrs.get('Meta'), 'slots', None)
+        if slots is None:
+            slots = any(getattr(getattr(b, '_meta', None), 'slots', False) for b in parents)
+        if slots:
+            new_attrs['__slots__'] = cls.get_slot_names(attrs, parents)
+        new_class = super_new(cls, name, bases, new_attrs)
         attr_meta = attrs.pop('Meta', None)
         abstract = getattr(attr_meta, 'abstract', False)
         if not attr_meta:
@@ -113,6 +244,7 @@ class ResourceBase(type):
         base_meta = getattr(new_class, '_meta', None)
 
         new_class.add_to_class('_meta', ResourceOptions(meta))
+        new_class._meta.slots = slots
         if not abstract:
             # Namespace is inherited
             if not new_class._meta.name_space and base_meta:
@@ -146,7 +278,8 @@ class ResourceBase(type):
                     raise Exception('Local field %r in class %r clashes with field of similar name from '
                                     'base class %r' % (field.attname, name, base.__name__))
             for field in parent_fields:
-                new_class.add_to_class(field.attname, copy.deepcopy(field))
+                # A shallow copy shares options (validators, choices, error messages etc) with the parent field.
+                new_class.add_to_class(field.attname, copy.copy(field))
 
             new_class._meta.parents.append(base)
 
@@ -162,6 +295,19 @@ class ResourceBase(type):
         # registered version.
         return registration.get_resource(new_class._meta.resource_name)
 
+    @staticmethod
+    def get_slot_names(attrs, parents):
+        """
+        Slots required for fields declared on this class along with fields copied from parents that do not already
+        provide a slot. Any ``__slots__`` declared on the class are also included (eg for use by ``extra_attrs``).
+        """
+        slot_names = list(attrs.pop('__slots__', ()))
+        slot_names.extend(obj_name for obj_name, obj in attrs.items() if isinstance(obj, Field))
+        for base in parents:
+            if hasattr(base, '_meta'):
+                slot_names.extend(f.attname for f in base._meta.fields if not hasattr(base, f.attname))
+        return tuple(slot_names)
+
     def add_to_class(cls, name, value):
         if hasattr(value, 'contribute_to_class'):
             value.contribute_to_class(cls, name)
@@ -170,6 +316,12 @@ class ResourceBase(type):
 
 
 class Resource(six.with_metaclass(ResourceBase)):
+    # Resources with the slots meta option are only compact if every base also defines __slots__.
+    __slots__ = ()
+
+    # Raw values of fields that have not yet been cleaned (for lazily loaded resources).
+    _lazy_fields = None
+
     def __init__(self, **kwargs):
         for field in iter(self._meta.fields):
             try:
@@ -181,6 +333,27 @@ class Resource(six.with_metaclass(ResourceBase)):
         if kwargs:
             raise TypeError("'%s' is an invalid keyword argument for this function" % list(kwargs)[0])
 
+    def __getattr__(self, name):
+        # Only called if normal lookup fails, fields of a lazily loaded resource are cleaned on first access.
+        lazy_fields = self._lazy_fields
+        if lazy_fields and name in lazy_fields:
+            try:
+                return self._clean_lazy_field(name)
+            except ValidationError as e:
+                raise ValidationError({lazy_fields[name][0].name: e.error_messages})
+        raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
+
+    def _clean_lazy_field(self, attname):
+        field, raw_value = self._lazy_fields[attname]
+        value = field.clean(raw_value)
+        del self._lazy_fields[attname]
+        setattr(self, attname, value)
+        return value
+
+    def __reduce__(self):
+        # Pickle as a compact tuple of field values, see ``unpickle_resource``.
+        return self._meta.reducer(self)
+
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, self)
 
@@ -201,11 +374,23 @@ class Resource(six.with_metaclass(ResourceBase)):
         """
         pass
 
-    def full_clean(self):
+    def full_clean(self, fail_fast=False):
         """
         Calls clean_fields, clean on the resource and raises ``ValidationError``
         for any errors that occurred.
+
+        :param fail_fast: Raise a ``ValidationError`` for the first error found rather than for all errors, the path of
+            the error is available from the ``path`` attribute of the error.
         """
+        if fail_fast:
+            errors = exceptions.FailFastErrors()
+            self.clean_fields(errors)
+            try:
+                self.clean()
+            except ValidationError as e:
+                errors.update(e.update_error_dict({}))
+            return
+
         errors = {}
 
         try:
@@ -221,10 +406,29 @@ class Resource(six.with_metaclass(ResourceBase)):
         if errors:
             raise ValidationError(errors)
 
-    def clean_fields(self):
-        errors = {}
+    def clean_fields(self, errors=None):
+        """
+        Clean the value of each field and raise ``ValidationError`` for any errors that occurred.
+
+        :param errors: Dict to record errors into; a ``FailFastErrors`` dict raises for the first error.
+        """
+        errors = {} if errors is None else errors
 
+        lazy_fields = self._lazy_fields
         for f in self._meta.fields:
+            if lazy_fields and f.attname in lazy_fields:
+                try:
+                    # Normal lookup only succeeds if a value was assigned before the field was loaded.
+                    object.__getattribute__(self, f.attname)
+                except AttributeError:
+                    # Lazily loaded fields are cleaned as they are loaded.
+                    try:
+                        self._clean_lazy_field(f.attname)
+                    except ValidationError as e:
+                        errors[f.name] = e.messages
+                    continue
+                del lazy_fields[f.attname]
+
             raw_value = f.value_from_object(self)
 
             if f.null and raw_value is None:
@@ -238,12 +442,55 @@ class Resource(six.with_metaclass(ResourceBase)):
             raise ValidationError(errors)
 
 
-def create_resource_from_dict(obj, resource_name=None):
+def unpickle_resource(resource_type, values):
     """
-    Create a resource from a dict object.
+    Restore a pickled resource from a tuple of field values. Values are not validated.
     """
-    assert isinstance(obj, dict)
+    return resource_type._meta.restorer(values)
+
+
+def parse_projection(only):
+    """
+    Parse a list of field paths into a dict of field attribute names mapped to a tuple of paths within that field (or
+    ``None`` if the entire field is selected).
+
+    Paths are attribute names; a dotted path eg ``owner.name`` selects a field of a child resource of a composite
+    field.
+    """
+    projection = {}
+    for path in only:
+        name, _, child_path = path.partition('.')
+        if not child_path or projection.get(name, ()) is None:
+            projection[name] = None
+        else:
+            projection[name] = projection.get(name, ()) + (child_path,)
+    return projection
+
+
+def create_lazy_resource(resource_type, obj):
+    """
+    Create a resource where each field is converted and validated when it is first accessed.
+
+    Resource level validation (``clean``) is only performed by ``full_clean``, which also forces all fields to be
+    cleaned.
+    """
+    new_resource = resource_type.__new__(resource_type)
+    new_resource._lazy_fields = dict(
+        (f.attname, (f, obj.pop(f.name, NOT_PROVIDED))) for f in resource_type._meta.fields)
+    if obj:
+        new_resource.extra_attrs(obj)
+    return new_resource
 
+
+def resolve_resource_type(obj, resource_name=None):
+    """
+    Get the resource type of a dict object, the resource type field is removed from the dict.
+
+    :param obj: The dict to get the resource type of.
+    :param resource_name: The name of the expected resource type.
+    :raises ValidationError: The resource type is not defined, not registered or not compatible with the expected
+        resource type.
+    """
     # Get the correct resource name
     document_resource_name = obj.pop(RESOURCE_TYPE_FIELD, resource_name)
     if not (document_resource_name or resource_name):
@@ -253,27 +500,60 @@ def create_resource_from_dict(obj, resource_name=None):
     if not resource_type:
         raise exceptions.ValidationError("Resource `%s` is not registered." % document_resource_name)
 
-    # Check if we have an inherited type.
+    # Check if we have an inherited type (any descendant of the expected resource type).
     if resource_name and not (resource_name == document_resource_name or
-                              resource_name in resource_type._meta.parent_resource_names):
+                              registration.is_sub_resource(resource_type, resource_name)):
         raise exceptions.ValidationError(
             "Expected resource `%s` does not match resource defined in JSRN document `%s`." % (
                 resource_name, document_resource_name))
 
-    errors = {}
-    attrs = {}
-    for f in resource_type._meta.fields:
-        value = obj.pop(f.name, NOT_PROVIDED)
-        try:
-            attrs[f.attname] = f.clean(value)
-        except exceptions.ValidationError as ve:
-            errors[f.name] = ve.error_messages
+    return resource_type
 
-    if errors:
-        raise exceptions.ValidationError(errors)
 
-    new_resource = resource_type(**attrs)
-    if obj:
-        new_resource.extra_attrs(obj)
-    new_resource.full_clean()
-    return new_resource
+def create_resource_from_dict(obj, resource_name=None, trusted=False, lazy=False, only=None, errors=None,
+                              fail_fast=False):
+    """
+    Create a resource from a dict object.
+
+    Field values are cleaned by the decoder compiled for the resource type (see ``ResourceOptions.decoder``).
+
+    :param obj: The dict to create the resource from.
+    :param resource_name: The name of the expected resource type.
+    :param trusted: The data is from a trusted source (eg data previously dumped by JSRN); values are converted to the
+        expected types but validation is skipped.
+    :param lazy: Fields are converted and validated on first access, see ``create_lazy_resource``. Ignored for trusted
+        data, if fields are selected with ``only`` or for resources that use slots or a custom ``__init__``.
+    :param only: Only decode the fields selected by a list of attribute names or dotted paths into the fields of child
+        resources (eg ``['id', 'owner.name']``). Other fields are not decoded or validated and are set to ``None``.
+        Names that are not fields raise a ``ValueError`` (see ``ResourceOptions.check_projection``).
+    :param errors: Dict that errors are recorded into rather than raising a ``ValidationError``; ``None`` is returned
+        if the resource is not valid. Ignored for trusted or lazy decoding.
+    :param fail_fast: Raise a ``ValidationError`` for the first error found rather than validating the entire resource
+        (see ``exceptions.FailFastErrors``). Ignored for trusted or lazy decoding.
+    """
+    assert isinstance(obj, dict)
+
+    if fail_fast and not trusted:
+        errors = exceptions.FailFastErrors()
+        lazy = False
+
+    if errors is None or trusted:
+        resource_type = resolve_resource_type(obj, resource_name)
+    else:
+        try:
+            resource_type = resolve_resource_type(obj, resource_name)
+        except ValidationError as ve:
+            errors.update(ve.update_error_dict({}))
+            return None
+
+    if only is not None:
+        # Paths are checked against the expected resource type, fields of the document type may be a subset.
+        expected_type = registration.get_resource(resource_name) if resource_name else None
+        (expected_type or resource_type)._meta.check_projection(only)
+        decoder = resource_type._meta.get_decoder(trusted, only)
+        return decoder(obj) if trusted else decoder(obj, errors)
+    if trusted:
+        return resource_type._meta.trusted_decoder(obj)
+    if lazy and not resource_type._meta.slots and resource_type.__init__ is Resource.__init__:
+        return create_lazy_resource(resource_type, obj)
+    return resource_type._meta.decoder(obj, errors)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental parsing and writing of JSON documents that contain large arrays.
+
+Only a single element of the array (along with a chunk of unparsed or unwritten output) is held in memory at any time.
+"""
+import codecs
+import six
+try:
+    import simplejson as json
+except ImportError:
+    import json
+from jsrn.encoding import JSRNEncoder
+
+DEFAULT_CHUNK_SIZE = 65536
+WHITESPACE = ' \t\n\r'
+# Parse errors within this many characters of the end of the buffered input may be caused by a value that is split
+# across chunks (eg a partial literal, number or escape sequence).
+TRUNCATION_MARGIN = 16
+NUMBER_CHARS = '0123456789+-.eE'
+NUMBER_TYPES = six.integer_types + (float, )
+
+_decoder = json.JSONDecoder()
+
+
+class StreamBuffer(object):
+    """
+    Buffer over a file object that decodes JSON values as the file is read.
+    """
+    def __init__(self, fp, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.data = ''
+        self.pos = 0
+        self.eof = False
+        self._text_decoder = None
+
+    def fill(self):
+        """
+        Discard consumed input and read another chunk. At least as much input as is currently buffered is read so
+        large values do not need to be re-parsed for every chunk.
+
+        :returns: False if the end of file has been reached.
+        """
+        chunk = raw = self.fp.read(max(self.chunk_size, len(self.data) - self.pos))
+        if isinstance(raw, (bytes, bytearray)):
+            if self._text_decoder is None:
+                self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = self._text_decoder.decode(raw, final=not raw)
+        self.data = self.data[self.pos:] + chunk
+        self.pos = 0
+        if not raw:
+            self.eof = True
+        return not self.eof
+
+    def peek(self):
+        """
+        Skip any whitespace and return the next character (an empty string at the end of the file).
+        """
+        while True:
+            data, pos = self.data, self.pos
+            while pos < len(data) and data[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(data):
+                return data[pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        """
+        Consume the next (non-whitespace) character, raising ``ValueError`` if it is not ``char``.
+        """
+        actual = self.peek()
+        if actual != char:
+            raise ValueError("Expected `%s` at position %d, found `%s`." % (char, self.pos, actual or 'EOF'))
+        self.pos += 1
+
+    def decode_value(self):
+        """
+        Decode the next JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.data, self.pos)
+            except ValueError as e:
+                # Value may be incomplete; read more input and try again.
+                if self._is_truncated(e) and self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may be incomplete (including a partial fraction or exponent).
+            remaining = len(self.data) - end
+            if self.eof or not (remaining == 0 or (remaining < 3 and type(value) in NUMBER_TYPES and
+                                                   not self.data[end:].strip(NUMBER_CHARS))):
+                self.pos = end
+                return value
+            self.fill()
+
+    def _is_truncated(self, error):
+        """
+        The parse error may have been caused by the end of the buffered input rather than invalid JSON.
+        """
+        pos = getattr(error, 'pos', None)
+        if pos is None:
+            # Position not reported (Python 2 json module).
+            return True
+        # The position of an unterminated string is the start of the string.
+        return pos >= len(self.data) - TRUNCATION_MARGIN or error.msg.startswith('Unterminated string')
+
+
+def iter_array(fp, path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate the elements of a JSON array without loading the entire document.
+
+    :param fp: File object containing a JSON document.
+    :param path: Sequence of object keys that lead to the array, if not supplied the document must be an array.
+    :param chunk_size: Size of chunks read from the file.
+    :raises ValueError: The document is not valid JSON or the path could not be found.
+    """
+    buf = StreamBuffer(fp, chunk_size)
+
+    for key in path or ():
+        buf.expect('{')
+        while True:
+            if buf.peek() == '}':
+                raise ValueError("Key `%s` not found in document." % key)
+            name = buf.decode_value()
+            buf.expect(':')
+            if name == key:
+                break
+            buf.decode_value()
+            if buf.peek() == ',':
+                buf.pos += 1
+
+    buf.expect('[')
+    if buf.peek() == ']':
+        return
+    while True:
+        yield buf.decode_value()
+        char = buf.peek()
+        if char == ',':
+            buf.pos += 1
+        elif char == ']':
+            return
+        else:
+            raise ValueError("Expected `,` or `]` at position %d, found `%s`." % (buf.pos, char or 'EOF'))
+
+
+class ResourceWriter(object):
+    """
+    Writes resources to a file as a JSON array one element at a time, output is buffered into writes of around
+    ``buffer_size`` characters.
+
+    Use as a context manager::
+
+        with ResourceWriter(fp) as writer:
+            for book in books:
+                writer.write(book)
+
+    If an exception is raised within the context the output is flushed but the array is not terminated.
+    """
+    def __init__(self, fp, pretty_print=False, buffer_size=DEFAULT_CHUNK_SIZE):
+        self.fp = fp
+        self.pretty_print = pretty_print
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._encode = JSRNEncoder(indent=4 if pretty_print else None).encode
+        self._buffer = []
+        self._buffered = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.flush()
+
+    def _write(self, s):
+        self._buffer.append(s)
+        self._buffered += len(s)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def open(self):
+        """
+        Start the array.
+        """
+        self._write('[')
+
+    def write(self, resource):
+        """
+        Write a resource (or any value that can be JSON encoded) as the next element of the array.
+        """
+        s = self._encode(resource)
+        if self.pretty_print:
+            s = '\n' + '\n'.join('    ' + line for line in s.splitlines())
+        if self.count:
+            s = ',' + s if self.pretty_print else ', ' + s
+        self._write(s)
+        self.count += 1
+
+    def flush(self):
+        """
+        Write any buffered output to the file.
+        """
+        if self._buffer:
+            self.fp.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def close(self):
+        """
+        Terminate the array and flush output.
+        """
+        self._write('\n]' if self.pretty_print and self.count else ']')
+        self.flush()
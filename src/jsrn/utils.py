@@ -1,11 +1,34 @@
 # -*- coding: utf-8 -*-
 import re
+import sys
 
 _CAMEL_CASE_RE = re.compile(r'[A-Z]')
 _LOWER_UNDERSCORE_CASE_RE = re.compile(r'_([a-z])')
 _LOWER_DASH_CASE_RE = re.compile(r'-([a-z])')
 
 
+# NumPy is not installed, avoids searching for the module on every call of get_numpy.
+_numpy_missing = False
+
+
+def get_numpy(load=True):
+    """
+    Get the NumPy module or ``None`` if NumPy is not installed.
+
+    NumPy is slow to import so it is not imported until it is first required. Use ``load=False`` when only checking
+    values (eg ``isinstance(value, numpy.ndarray)``); a NumPy value cannot exist unless NumPy has been imported so
+    ``None`` is returned rather than importing it.
+    """
+    global _numpy_missing
+    numpy = sys.modules.get('numpy')
+    if numpy is None and load and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+    return numpy
+
+
 def camel_to_lower_separated(s, sep):
     """
     Convert camel case representation into lower separated case ie:
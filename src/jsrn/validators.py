@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 # This file is largely verbatim from the Django project.
+import array
 from jsrn import exceptions
+from jsrn.utils import get_numpy
+
 
 EMPTY_VALUES = (None, '', [], (), {})
 
@@ -45,3 +48,70 @@ class MinLengthValidator(BaseValidator):
     clean = lambda self, x: len(x)
     message = 'Ensure this value has at least %(limit_value)d characters (it has %(show_value)d).'
     code = 'min_length'
+
+
+def compile_validator(validator, error_messages=None):
+    """
+    Compile a validator into a callable that returns a list of error messages (or ``None`` if the value is valid)
+    rather than raising ``ValidationError``.
+
+    Limit validators (sub-classes of ``BaseValidator``) are evaluated directly without raising an exception, any other
+    validator is called and an exception caught. Messages are overridden by ``error_messages`` (keyed by code) in the
+    same way as ``Field.run_validators``.
+    """
+    error_messages = error_messages or {}
+
+    if isinstance(validator, BaseValidator) and type(validator).__call__ is BaseValidator.__call__:
+        clean, compare, limit_value = validator.clean, validator.compare, validator.limit_value
+        message = error_messages.get(validator.code, validator.message)
+
+        def check_limit(value):
+            cleaned = clean(value)
+            if compare(cleaned, limit_value):
+                return [message % {'limit_value': limit_value, 'show_value': cleaned}]
+        return check_limit
+
+    def check(value):
+        try:
+            validator(value)
+        except exceptions.ValidationError as e:
+            if getattr(e, 'code', None) in error_messages:
+                message = error_messages[e.code]
+                return [message % e.params if e.params else message]
+            return e.messages
+    return check
+
+
+def find_limit_failures(validator, values, limit=None):
+    """
+    Find the indexes of values in a sequence that fail a ``MinValueValidator`` or ``MaxValueValidator``.
+
+    The sequence is checked as a whole; NumPy arrays (and ``array.array`` if NumPy is installed) are compared in a
+    single vectorised operation, otherwise ``min``/``max`` is used so only sequences that contain invalid values are
+    scanned. NumPy is imported on first use.
+
+    :param validator: A ``MinValueValidator`` or ``MaxValueValidator``.
+    :param values: Sequence of values eg an ``array.array``.
+    :param limit: Limit to compare against if different from ``validator.limit_value`` (eg converted for storage).
+    :returns: List of indexes.
+    """
+    if limit is None:
+        limit = validator.limit_value
+    is_min = isinstance(validator, MinValueValidator)
+    if not len(values):
+        return []
+
+    numpy = get_numpy()
+    if numpy is not None:
+        if isinstance(values, array.array):
+            values = numpy.frombuffer(values, values.typecode)
+        if isinstance(values, numpy.ndarray):
+            return numpy.flatnonzero(values < limit if is_min else values > limit).tolist()
+
+    if is_min:
+        if min(values) >= limit:
+            return []
+        return [idx for idx, value in enumerate(values) if value < limit]
+    if max(values) <= limit:
+        return []
+    return [idx for idx, value in enumerate(values) if value > limit]
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import tempfile
+import json
+import unittest
+import jsrn
+from jsrn import backends, columns, datetimeutil
+from jsrn.fields import DateTimeField
+from jsrn.encoding import to_json_value
+
+
+class Author(jsrn.Resource):
+    class Meta:
+        name_space = "backends"
+
+    name = jsrn.StringField()
+
+
+class Book(jsrn.Resource):
+    class Meta:
+        name_space = "backends"
+
+    title = jsrn.StringField()
+    published = DateTimeField(null=True)
+    pages = jsrn.IntegerField(null=True)
+    tags = jsrn.ArrayField(null=True)
+    extra = jsrn.ObjectField(null=True)
+    authors = jsrn.ArrayOf(Author)
+    publisher = jsrn.ObjectAs(Author, null=True)
+
+
+class ToJSONValueTestCase(unittest.TestCase):
+    def test_resource(self):
+        book = Book(title="Consider Phlebas", pages=471, tags=["sci-fi"], authors=[Author(name="Iain M. Banks")],
+                    published=datetime.datetime(1987, 4, 23, tzinfo=datetimeutil.utc),
+                    publisher=Author(name="Macmillan"), extra={'editor': Author(name="Someone")})
+
+        actual = to_json_value(book)
+
+        self.assertEqual(json.loads(jsrn.dumps(book)), actual)
+        self.assertEqual({'$': 'backends.Author', 'name': "Macmillan"}, actual['publisher'])
+        self.assertEqual({'$': 'backends.Author', 'name': "Someone"}, actual['extra']['editor'])
+
+    def test_values(self):
+        values = [1, "a", None, {'a': 1}]
+
+        self.assertIs(values[3], to_json_value(values)[3])
+        self.assertEqual([{'$': 'backends.Author', 'name': "a"}], to_json_value((Author(name="a"), )))
+
+    def test_resource_array(self):
+        authors = columns.ResourceArray(Author, [Author(name="a")])
+
+        self.assertEqual([{'$': 'backends.Author', 'name': "a"}], to_json_value(authors))
+
+
+class BackendTestCase(unittest.TestCase):
+    def setUp(self):
+        self.book = Book(title=u"Excession \xe9/", pages=451, tags=["sci-fi"], authors=[Author(name="Iain M. Banks")],
+                         extra={"rating": 4.5, "reviewer": Author(name="Someone")}, publisher=Author(name="Orbit"))
+
+    def test_available_backends(self):
+        self.assertEqual('json', backends.available_backends()[-1])
+        self.assertIs(backends.get_backend(backends.available_backends()[0]), backends.get_backend('auto'))
+
+    def test_round_trip(self):
+        expected = json.loads(backends.get_backend('json').dumps(self.book))
+
+        for name in backends.available_backends():
+            backend = backends.get_backend(name)
+            for pretty_print in (False, True):
+                data = backend.dumps(self.book, pretty_print)
+                self.assertEqual(expected, json.loads(data), name)
+                self.assertEqual(expected, backend.loads(data), name)
+                self.assertEqual(expected, backend.loads(data.encode('utf-8')), name)
+
+    def test_dump(self):
+        class Writer(object):
+            def __init__(self):
+                self.writes = []
+
+            def write(self, s):
+                self.writes.append(s)
+
+        expected = json.loads(backends.get_backend('json').dumps(self.book))
+        for name in backends.available_backends():
+            fp = Writer()
+            backends.get_backend(name).dump([self.book] * 10, fp)
+            self.assertEqual([expected] * 10, json.loads(''.join(fp.writes)), name)
+
+        fp = Writer()
+        backends.get_backend('json').dump([self.book] * 10, fp)
+        self.assertGreater(len(fp.writes), 10)
+
+    def test_invalid_document(self):
+        for name in backends.available_backends():
+            self.assertRaises(ValueError, backends.get_backend(name).loads, '{"a": ')
+
+    def test_unknown_value(self):
+        for name in backends.available_backends():
+            self.assertRaises(TypeError, backends.get_backend(name).dumps, {'a': object()})
+
+    def test_standard_library_values(self):
+        for extra in ({1: "a", None: "b"}, {"big": 2 ** 70}, {"nan": float('nan'), "inf": [float('inf')]}):
+            book = Book(title="Excession", extra=extra)
+            expected = backends.get_backend('json').dumps(book)
+            for name in backends.available_backends():
+                for dumps in (backends.get_backend(name).dumps, backends.dumps, jsrn.dumps):
+                    actual = dumps(book, pretty_print=False)
+                    self.assertEqual(json.loads(expected)['extra'].keys(), json.loads(actual)['extra'].keys(), name)
+                    self.assertEqual(expected.count('NaN'), actual.count('NaN'), name)
+                    self.assertEqual(expected.count('Infinity'), actual.count('Infinity'), name)
+                    self.assertEqual(json.loads(expected)['extra'].get('big'), json.loads(actual)['extra'].get('big'))
+
+    def test_non_finite_round_trip(self):
+        book = Book(title="Excession", publisher=None,
+                    extra={"nan": float('nan'), "inf": float('inf'), "-inf": float('-inf')})
+
+        for name in backends.available_backends():
+            backend = backends.get_backend(name)
+            data = backend.dumps(book, pretty_print=False)
+            for actual in (backend.loads(data), backend.loadb(data.encode('utf-8')),
+                           backend.loadb(memoryview(data.encode('utf-8')))):
+                self.assertNotEqual(actual['extra']['nan'], actual['extra']['nan'], name)
+                self.assertEqual([float('inf'), float('-inf')], [actual['extra']['inf'], actual['extra']['-inf']])
+        actual = jsrn.loads(jsrn.dumps(book))
+        self.assertEqual(float('inf'), actual.extra['inf'])
+
+    def test_pretty_print(self):
+        self.assertEqual(jsrn.dumps(self.book), backends.get_backend('json').dumps(self.book, pretty_print=True))
+
+    def test_set_backend(self):
+        try:
+            backends.set_backend('json')
+            self.assertEqual('json', backends.get_backend().name.replace('simplejson', 'json'))
+            self.assertEqual("Iain M. Banks", jsrn.loads(jsrn.dumps(self.book)).authors[0].name)
+        finally:
+            backends.set_backend('auto')
+
+        self.assertRaises(ValueError, backends.set_backend, 'unknown')
+
+    def test_benchmark(self):
+        results = backends.benchmark([self.book] * 10, number=1)
+
+        self.assertEqual(set(backends.available_backends()), set(results))
+        for result in results.values():
+            self.assertGreater(result['dumps'], 0)
+            self.assertGreater(result['loads'], 0)
+
+
+class BytesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.book = Book(title=u"Excession \xe9", authors=[Author(name="Iain M. Banks")], publisher=None)
+
+    def test_backends(self):
+        expected = json.loads(backends.get_backend('json').dumps(self.book))
+
+        for name in backends.available_backends():
+            backend = backends.get_backend(name)
+            data = backend.dumpb(self.book)
+            self.assertIsInstance(data, bytes, name)
+            self.assertEqual(expected, json.loads(data.decode('utf-8')), name)
+            for value in (data, bytearray(data), memoryview(data)):
+                self.assertEqual(expected, backend.loadb(value), name)
+
+    def test_round_trip(self):
+        data = jsrn.dumpb(self.book)
+
+        self.assertIsInstance(data, bytes)
+        for value in (data, bytearray(data), memoryview(data)):
+            actual = jsrn.loadb(value, Book)
+            self.assertEqual(u"Excession \xe9", actual.title)
+            self.assertEqual("Iain M. Banks", actual.authors[0].name)
+
+    def test_pretty_print(self):
+        self.assertEqual(jsrn.dumps(self.book).encode('utf-8'), jsrn.dumpb(self.book, pretty_print=True))
+
+    def test_loadb_fail_fast(self):
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.loadb(b'{"$": "backends.Book", "title": "a", "authors": [{}]}', fail_fast=True)
+        self.assertEqual(('authors', '0', 'name'), cm.exception.path)
+
+
+class LoadPathTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.books = [Book(title=u"Excession \xe9", authors=[Author(name="Iain M. Banks")], publisher=None),
+                      Book(title="Inversions", authors=[], publisher=Author(name="Orbit"))]
+        with open(self.path, 'wb') as fp:
+            fp.write(jsrn.dumpb(self.books))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_load_path(self):
+        for mmap in (True, False):
+            actual = jsrn.load_path(self.path, Book, mmap=mmap)
+            self.assertEqual([u"Excession \xe9", "Inversions"], [b.title for b in actual])
+            self.assertEqual("Orbit", actual[1].publisher.name)
+
+    def test_options(self):
+        self.assertEqual(["Inversions"], [b.title for b in jsrn.load_path(self.path, lazy=True)][1:])
+        self.assertIsNone(jsrn.load_path(self.path, only=['title'])[0].authors)
+
+    def test_load_file(self):
+        for name in backends.available_backends():
+            backends.set_backend(name)
+            try:
+                with open(self.path, 'rb') as fp:
+                    self.assertEqual(2, len(backends.load_file(fp)), name)
+            finally:
+                backends.set_backend('auto')
+
+    def test_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+
+        self.assertRaises(ValueError, jsrn.load_path, self.path)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+import jsrn
+from jsrn import binary, exceptions
+
+
+class Author(jsrn.Resource):
+    class Meta:
+        name_space = "binary"
+
+    name = jsrn.StringField()
+
+
+class Editor(Author):
+    class Meta:
+        name_space = "binary"
+
+    house = jsrn.StringField(null=True)
+
+
+class Book(jsrn.Resource):
+    class Meta:
+        name_space = "binary"
+
+    title = jsrn.StringField()
+    pages = jsrn.IntegerField(min_value=1, null=True)
+    price = jsrn.FloatField(null=True)
+    in_print = jsrn.BooleanField(null=True)
+    tags = jsrn.ArrayField(null=True)
+    publisher = jsrn.ObjectAs(Author, null=True)
+    authors = jsrn.ArrayOf(Author)
+
+
+class PackTestCase(unittest.TestCase):
+    def assertPacks(self, value, expected):
+        self.assertEqual(expected, binary.packb(value))
+        self.assertEqual(value, binary.unpackb(expected))
+
+    def test_scalars(self):
+        self.assertPacks(None, b'\xc0')
+        self.assertPacks(True, b'\xc3')
+        self.assertPacks(False, b'\xc2')
+        self.assertPacks(1.5, b'\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00')
+
+    def test_integers(self):
+        self.assertPacks(0, b'\x00')
+        self.assertPacks(127, b'\x7f')
+        self.assertPacks(-1, b'\xff')
+        self.assertPacks(-32, b'\xe0')
+        self.assertPacks(128, b'\xcc\x80')
+        self.assertPacks(65536, b'\xce\x00\x01\x00\x00')
+        self.assertPacks(-33, b'\xd0\xdf')
+        self.assertPacks(-2 ** 63, b'\xd3\x80\x00\x00\x00\x00\x00\x00\x00')
+        self.assertPacks(2 ** 64 - 1, b'\xcf' + b'\xff' * 8)
+        self.assertRaises(OverflowError, binary.packb, 2 ** 64)
+
+    def test_strings(self):
+        self.assertPacks(u'', b'\xa0')
+        self.assertPacks(u'abc', b'\xa3abc')
+        self.assertPacks(u'\xe9', b'\xa2\xc3\xa9')
+        self.assertPacks(u'a' * 32, b'\xd9\x20' + b'a' * 32)
+        self.assertPacks(u'a' * 256, b'\xda\x01\x00' + b'a' * 256)
+        self.assertPacks(b'\x00\x01', b'\xc4\x02\x00\x01')
+
+    def test_containers(self):
+        self.assertPacks([], b'\x90')
+        self.assertPacks([1, [2]], b'\x92\x01\x91\x02')
+        self.assertPacks(list(range(16)), b'\xdc\x00\x10' + bytes(bytearray(range(16))))
+        self.assertPacks({u'a': 1}, b'\x81\xa1a\x01')
+
+    def test_default(self):
+        self.assertRaises(TypeError, binary.packb, object())
+        self.assertEqual(b'\xa1x', binary.packb(object(), default=lambda o: u'x'))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, binary.unpackb, b'')
+        self.assertRaises(ValueError, binary.unpackb, b'\x92\x01')
+        self.assertRaises(ValueError, binary.unpackb, b'\xa3ab')
+        self.assertRaises(ValueError, binary.unpackb, b'\x01\x02')
+        self.assertRaises(ValueError, binary.unpackb, b'\xc1')
+
+    def test_memoryview(self):
+        self.assertEqual([1, u'a'], binary.unpackb(memoryview(b'\x92\x01\xa1a')))
+
+
+class BinaryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.book = Book(title="Consider Phlebas", pages=471, price=9.99, in_print=True, tags=["sci-fi"],
+                         publisher=Author(name="Macmillan"),
+                         authors=[Author(name="Iain M. Banks"), Editor(name="Someone", house=None)])
+
+    def test_encode(self):
+        document = binary.encode(self.book)
+
+        self.assertEqual([
+            binary.FORMAT_VERSION,
+            ["binary.Book", "binary.Author", "binary.Editor"],
+            [0, "Consider Phlebas", 471, 9.99, True, ["sci-fi"], [1, "Macmillan"],
+             [[1, "Iain M. Banks"], [2, None, "Someone"]]],
+        ], document)
+
+    def test_round_trip(self):
+        actual = jsrn.loads_binary(jsrn.dumps_binary(self.book))
+
+        self.assertIsInstance(actual, Book)
+        self.assertEqual(self.book.title, actual.title)
+        self.assertEqual(471, actual.pages)
+        self.assertEqual(["sci-fi"], actual.tags)
+        self.assertEqual("Macmillan", actual.publisher.name)
+        self.assertEqual([Author, Editor], [type(a) for a in actual.authors])
+        self.assertEqual(jsrn.dumps(self.book), jsrn.dumps(actual))
+
+    def test_round_trip_list(self):
+        data = jsrn.dumps_binary([self.book, Book(title="Excession", authors=[])])
+
+        actual = jsrn.loads_binary(data, Book, trusted=True)
+
+        self.assertEqual(["Consider Phlebas", "Excession"], [b.title for b in actual])
+        self.assertEqual([], jsrn.loads_binary(jsrn.dumps_binary([])))
+
+    def test_file(self):
+        fp = io.BytesIO()
+        jsrn.dump_binary(self.book, fp)
+        fp.seek(0)
+
+        self.assertEqual("Iain M. Banks", jsrn.load_binary(fp, only=['authors.name']).authors[0].name)
+
+    def test_smaller_than_json(self):
+        books = [self.book] * 100
+
+        self.assertLess(len(jsrn.dumps_binary(books)) * 3, len(jsrn.dumps(books, pretty_print=False)))
+
+    def test_validation(self):
+        self.book.pages = 0
+        data = jsrn.dumps_binary(self.book)
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.loads_binary(data)
+        self.assertEqual(['pages'], list(cm.exception.message_dict))
+
+    def test_resource_mismatch(self):
+        data = jsrn.dumps_binary(Author(name="Iain M. Banks"))
+
+        self.assertRaises(exceptions.ValidationError, jsrn.loads_binary, data, Book)
+
+    def test_schema_mismatch(self):
+        data = binary.packb([binary.FORMAT_VERSION, ["binary.Author"], [0, "a", "b"]])
+        self.assertRaises(exceptions.ValidationError, jsrn.loads_binary, data)
+
+        data = binary.packb([binary.FORMAT_VERSION, ["binary.Unknown"], [0]])
+        self.assertRaises(exceptions.ValidationError, jsrn.loads_binary, data)
+
+    def test_invalid_layout_index(self):
+        for index in (-1, 2, True, False, 0.0, "0", None):
+            document = [binary.FORMAT_VERSION, ["binary.Author", "binary.Editor"], [index, "a"]]
+            self.assertRaises(exceptions.ValidationError, binary.decode, document)
+        self.assertRaises(exceptions.ValidationError, binary.decode,
+                          [binary.FORMAT_VERSION, ["binary.Author"], [[0, "a"], []]])
+
+    def test_not_a_document(self):
+        self.assertRaises(ValueError, jsrn.loads_binary, binary.packb({"$": "binary.Author"}))
+        self.assertRaises(TypeError, jsrn.dumps_binary, {"a": 1})
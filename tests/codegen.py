@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+import jsrn
+from jsrn import codegen, exceptions, resources
+from jsrn.resources import create_resource_from_dict
+
+
+class Tag(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    name = jsrn.StringField()
+
+
+class Article(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    title = jsrn.StringField(name="Title", max_length=20)
+    views = jsrn.IntegerField(min_value=0, use_default_if_not_provided=True, default=0)
+    rating = jsrn.FloatField(null=True)
+    tags = jsrn.ArrayOf(Tag)
+
+    def extra_attrs(self, attrs):
+        self.extra = attrs
+
+
+class CustomInitArticle(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    title = jsrn.StringField()
+
+    def __init__(self, **kwargs):
+        super(CustomInitArticle, self).__init__(**kwargs)
+        self.initialised = True
+
+
+class CountingStringField(jsrn.StringField):
+    validate_count = 0
+
+    def validate(self, value):
+        CountingStringField.validate_count += 1
+        super(CountingStringField, self).validate(value)
+
+
+class Comment(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    text = CountingStringField()
+
+
+class SignedComment(Comment):
+    class Meta:
+        name_space = "codegen"
+
+    author = jsrn.StringField()
+
+
+class Thread(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    subject = CountingStringField()
+    first = jsrn.ObjectAs(Comment)
+    replies = jsrn.ArrayOf(Comment)
+
+
+class StrictObjectAs(jsrn.ObjectAs):
+    def validate(self, value):
+        super(StrictObjectAs, self).validate(value)
+        if value is not None and value.name == 'bad':
+            raise exceptions.ValidationError("Bad tag.")
+
+
+class FirstArrayOf(jsrn.ArrayOf):
+    def to_python(self, value):
+        return super(FirstArrayOf, self).to_python(value)[:1]
+
+
+class Post(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    tag = StrictObjectAs(Tag, null=True)
+    tags = FirstArrayOf(Tag)
+
+
+class Score(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    value = jsrn.IntegerField()
+
+
+class Scoreboard(jsrn.Resource):
+    class Meta:
+        name_space = "codegen"
+
+    best = jsrn.ObjectAs(Score, null=True)
+    scores = jsrn.ArrayOf(Score)
+
+
+class CompiledDecoderTestCase(unittest.TestCase):
+    def test_decoder_is_cached(self):
+        self.assertIs(Article._meta.decoder, Article._meta.decoder)
+
+    def test_decode_valid(self):
+        actual = create_resource_from_dict({
+            "$": "codegen.Article",
+            "Title": "Example",
+            "views": "12",
+            "tags": [{"name": "python"}],
+            "other": 1,
+        })
+
+        self.assertIsInstance(actual, Article)
+        self.assertEqual("Example", actual.title)
+        self.assertEqual(12, actual.views)
+        self.assertIsNone(actual.rating)
+        self.assertEqual("python", actual.tags[0].name)
+        self.assertDictEqual({"other": 1}, actual.extra)
+
+    def test_decode_default_if_not_provided(self):
+        actual = Article._meta.decoder({"Title": "Example"})
+
+        self.assertEqual(0, actual.views)
+
+    def test_decode_collects_errors(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            Article._meta.decoder({"Title": "x" * 21, "views": -1})
+
+        self.assertEqual(["Title", "views"], sorted(cm.exception.message_dict))
+
+    def test_decode_custom_init(self):
+        actual = CustomInitArticle._meta.decoder({"title": "Example"})
+
+        self.assertEqual("Example", actual.title)
+        self.assertTrue(actual.initialised)
+
+    def test_decode_validates_fields_once(self):
+        CountingStringField.validate_count = 0
+
+        jsrn.loads('{"$": "codegen.Thread", "subject": "a", "first": {"text": "b"}, '
+                   '"replies": [{"text": "c"}, {"$": "codegen.Comment", "text": "d"}]}')
+
+        self.assertEqual(4, CountingStringField.validate_count)
+
+    def test_decode_nested_errors(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.loads('{"$": "codegen.Thread", "subject": "a", "first": {"text": "b"}, '
+                       '"replies": [{"text": "c"}, null]}')
+
+        self.assertEqual(["1"], list(cm.exception.message_dict["replies"]))
+
+    def test_decode_cleans_existing_resources(self):
+        comment = Comment(text=None)
+
+        with self.assertRaises(exceptions.ValidationError):
+            create_resource_from_dict({"subject": "a", "replies": [comment]}, "codegen.Thread")
+
+    def test_decode_overridden_validate(self):
+        field = StrictObjectAs(Tag)
+
+        self.assertRaises(exceptions.ValidationError, field.clean, {"name": "bad"})
+        self.assertEqual("good", field.clean({"name": "good"}).name)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.loads('{"$": "codegen.Post", "tag": {"name": "bad"}}')
+        self.assertEqual(["tag"], list(cm.exception.message_dict))
+
+    def test_decode_overridden_to_python(self):
+        field = FirstArrayOf(Tag)
+
+        self.assertEqual(["a"], [t.name for t in field.clean([{"name": "a"}, {"name": "b"}])])
+        post = jsrn.loads('{"$": "codegen.Post", "tags": [{"name": "a"}, {"name": "b"}]}')
+        self.assertEqual(["a"], [t.name for t in post.tags])
+
+    def test_generated_source_is_unrolled(self):
+        function_name, source = codegen.generate_decoder_source(Article)
+
+        self.assertEqual("decode_Article", function_name)
+        self.assertIn("pop('Title', NOT_PROVIDED)", source)
+        self.assertNotIn("for ", source)
+
+
+class TrustedDecoderTestCase(unittest.TestCase):
+    def test_trusted_decoder_is_cached(self):
+        self.assertIs(Article._meta.trusted_decoder, Article._meta.trusted_decoder)
+        self.assertIsNot(Article._meta.decoder, Article._meta.trusted_decoder)
+
+    def test_loads_trusted_skips_validation(self):
+        CountingStringField.validate_count = 0
+
+        actual = jsrn.loads('{"$": "codegen.Article", "Title": "%s", "views": "-1", "tags": [{"name": null}]}' % (
+            "x" * 21), trusted=True)
+
+        self.assertEqual("x" * 21, actual.title)
+        self.assertEqual(-1, actual.views)
+        self.assertIsInstance(actual.tags[0], Tag)
+        self.assertIsNone(actual.tags[0].name)
+
+    def test_loads_trusted_nested(self):
+        CountingStringField.validate_count = 0
+
+        actual = jsrn.loads('{"$": "codegen.Thread", "subject": null, "first": {"text": "b"}, '
+                            '"replies": [{"text": "c"}]}', trusted=True)
+
+        self.assertEqual("b", actual.first.text)
+        self.assertEqual("c", actual.replies[0].text)
+        self.assertEqual(0, CountingStringField.validate_count)
+
+    def test_loads_trusted_conversion_errors(self):
+        tests = (
+            ('{"$": "codegen.Article", "views": "abc"}', ["views"]),
+            ('{"$": "codegen.Scoreboard", "best": {"value": "abc"}}', ["best", "value"]),
+            ('{"$": "codegen.Scoreboard", "scores": [{"value": 1}, {"value": "abc"}]}', ["scores", "1", "value"]),
+        )
+        for document, path in tests:
+            with self.assertRaises(exceptions.ValidationError) as cm:
+                jsrn.loads(document, trusted=True)
+            error = cm.exception.message_dict
+            for key in path:
+                self.assertEqual([key], list(error))
+                error = error[key]
+            self.assertEqual(["'abc' value must be a integer."], error)
+
+    def test_loads_trusted_unknown_resource(self):
+        with self.assertRaises(exceptions.ValidationError):
+            jsrn.loads('{"$": "codegen.Unknown"}', trusted=True)
+
+
+class ProjectionTestCase(unittest.TestCase):
+    DOCUMENT = ('{"$": "codegen.Thread", "subject": "a", "first": {"text": null}, '
+                '"replies": [{"text": "c", "other": 1}, {"text": "d"}]}')
+
+    def test_parse_projection(self):
+        self.assertDictEqual({
+            "id": None,
+            "owner": ("name", "address.city"),
+            "tags": None,
+        }, resources.parse_projection(["id", "owner.name", "tags.name", "owner.address.city", "tags"]))
+
+    def test_loads_only(self):
+        CountingStringField.validate_count = 0
+
+        actual = jsrn.loads(self.DOCUMENT, only=["replies.text"])
+
+        self.assertIsNone(actual.subject)
+        self.assertIsNone(actual.first)
+        self.assertEqual(["c", "d"], [r.text for r in actual.replies])
+        self.assertEqual(2, CountingStringField.validate_count)
+
+    def test_loads_only_validates_selected(self):
+        with self.assertRaises(exceptions.ValidationError):
+            jsrn.loads(self.DOCUMENT, only=["subject", "first.text"])
+
+    def test_loads_only_trusted(self):
+        actual = jsrn.loads(self.DOCUMENT, trusted=True, only=["first.text", "subject"])
+
+        self.assertEqual("a", actual.subject)
+        self.assertIsNone(actual.first.text)
+        self.assertIsNone(actual.replies)
+
+    def test_loads_only_unknown_field(self):
+        for only in (["titel"], ["replies.txt"], ["subject.text"], ["first.text.value"]):
+            self.assertRaises(ValueError, jsrn.loads, self.DOCUMENT, only=only)
+            self.assertRaises(ValueError, jsrn.loads, self.DOCUMENT, trusted=True, only=only)
+
+    def test_loads_only_sub_resource_field(self):
+        actual = jsrn.loads('{"$": "codegen.Thread", "replies": [{"text": "a"}, '
+                            '{"$": "codegen.SignedComment", "text": "b", "author": "c"}]}', only=["replies.author"])
+
+        self.assertEqual([None, "c"], [getattr(r, 'author', None) for r in actual.replies])
+
+    def test_projected_decoder_is_cached(self):
+        self.assertIs(Thread._meta.get_decoder(only=["subject"]), Thread._meta.get_decoder(only=("subject",)))
+        self.assertIsNot(Thread._meta.get_decoder(only=["subject"]),
+                         Thread._meta.get_decoder(trusted=True, only=["subject"]))
+
+
+class CompiledEncoderTestCase(unittest.TestCase):
+    def test_encoder_is_cached(self):
+        self.assertIs(Article._meta.encoder, Article._meta.encoder)
+
+    def test_encode(self):
+        article = Article(title="Example", views=3, tags=[Tag(name="python")])
+
+        actual = Article._meta.encoder(article)
+
+        self.assertDictEqual({
+            "$": "codegen.Article",
+            "Title": "Example",
+            "views": 3,
+            "rating": None,
+            "tags": article.tags,
+        }, actual)
+
+    def test_dumps_round_trip(self):
+        article = Article(title="Example", views=3, tags=[Tag(name="python")])
+
+        actual = jsrn.loads(jsrn.dumps(article))
+
+        self.assertEqual("Example", actual.title)
+        self.assertEqual("python", actual.tags[0].name)
+
+    def test_generated_source_skips_identity_to_json(self):
+        function_name, source = codegen.generate_encoder_source(Article)
+
+        self.assertEqual("encode_Article", function_name)
+        self.assertIn("'Title': o.title,", source)
+        self.assertIn("'$': 'codegen.Article',", source)
+
+
+class CodeCacheTestCase(unittest.TestCase):
+    resource_count = 0
+
+    def setUp(self):
+        self.previous_cache = codegen.code_cache
+        self.path = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.path, 'cache')
+        codegen.set_code_cache_dir(self.cache_dir)
+
+    def tearDown(self):
+        codegen.code_cache = self.previous_cache
+        shutil.rmtree(self.path)
+
+    def create_resource(self):
+        # Resources are registered so each test requires a new resource type.
+        CodeCacheTestCase.resource_count += 1
+        resource_type = type(str('CachedArticle%d' % self.resource_count), (jsrn.Resource, ), {
+            'Meta': type(str('Meta'), (), {'name_space': "codegen"}),
+            '__module__': __name__,
+            'title': jsrn.StringField(max_length=10),
+        })
+        return resource_type
+
+    def test_fingerprint(self):
+        resource_type = self.create_resource()
+        fingerprint = codegen.schema_fingerprint(resource_type)
+
+        del resource_type._meta._schema_fingerprint
+        self.assertEqual(fingerprint, codegen.schema_fingerprint(resource_type))
+
+        del resource_type._meta._schema_fingerprint
+        resource_type._meta.fields[0].null = True
+        self.assertNotEqual(fingerprint, codegen.schema_fingerprint(resource_type))
+
+    def test_fingerprint_reset_by_add_field(self):
+        resource_type = self.create_resource()
+        fingerprint = codegen.schema_fingerprint(resource_type)
+
+        resource_type.add_to_class('views', jsrn.IntegerField())
+        self.assertNotEqual(fingerprint, codegen.schema_fingerprint(resource_type))
+
+    def test_compiled_code_reused(self):
+        resource_type = self.create_resource()
+        codegen.compile_decoder(resource_type)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        generate_decoder_source = codegen.generate_decoder_source
+        codegen.generate_decoder_source = None
+        try:
+            decoder = codegen.compile_decoder(resource_type)
+        finally:
+            codegen.generate_decoder_source = generate_decoder_source
+
+        self.assertEqual("a", decoder({'title': "a"}).title)
+        self.assertRaises(exceptions.ValidationError, decoder, {'title': "a" * 11})
+
+    def test_changed_resource_not_reused(self):
+        resource_type = self.create_resource()
+        codegen.compile_decoder(resource_type)
+
+        resource_type.add_to_class('views', jsrn.IntegerField(null=True))
+        decoder = codegen.compile_decoder(resource_type)
+
+        self.assertEqual(3, decoder({'title': "a", 'views': 3}).views)
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_projected_decoders(self):
+        resource_type = self.create_resource()
+        resource_type.add_to_class('views', jsrn.IntegerField())
+
+        self.assertIsNone(codegen.compile_decoder(resource_type, projection={'views': None})({'views': 1}).title)
+        self.assertEqual("a", codegen.compile_decoder(resource_type, projection={'title': None})({'title': "a"}).title)
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_invalid_cache_file(self):
+        resource_type = self.create_resource()
+        codegen.compile_encoder(resource_type)
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), 'wb') as fp:
+                fp.write(b'invalid')
+
+        self.assertEqual("a", codegen.compile_encoder(resource_type)(resource_type(title="a"))['title'])
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+import jsrn
+from jsrn import columns, datetimeutil, exceptions
+from jsrn.fields import DateTimeField
+from jsrn.utils import get_numpy
+
+
+class Reading(jsrn.Resource):
+    class Meta:
+        name_space = "columns"
+
+    sensor = jsrn.StringField()
+    value = jsrn.FloatField(min_value=-50, max_value=150)
+    count = jsrn.IntegerField(min_value=0, null=True)
+    active = jsrn.BooleanField(null=True)
+    taken = DateTimeField(assume_local=False, null=True)
+
+
+class Span(jsrn.Resource):
+    class Meta:
+        name_space = "columns"
+
+    start = jsrn.IntegerField()
+    end = jsrn.IntegerField()
+
+    def clean(self):
+        if self.end < self.start:
+            raise exceptions.ValidationError("End before start.")
+
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def length(self):
+        return self.duration()
+
+    @staticmethod
+    def unit():
+        return "s"
+
+    @classmethod
+    def type_name(cls):
+        return cls.__name__
+
+
+class NamedSpan(Span):
+    class Meta:
+        name_space = "columns"
+
+    name = jsrn.StringField(null=True)
+
+    def clean(self):
+        super(NamedSpan, self).clean()
+        if not self.name:
+            raise exceptions.ValidationError("Name required.")
+
+
+class Range(jsrn.Resource):
+    class Meta:
+        name_space = "columns"
+
+    low = jsrn.IntegerField()
+    high = jsrn.IntegerField(max_value=10)
+
+    def clean(self):
+        if self.low > self.high:
+            raise exceptions.ValidationError({'low': ["low must be <= high"]})
+
+
+class ResourceArrayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.taken = datetime.datetime(2013, 7, 13, 16, 54, 46, 123000, datetimeutil.utc)
+        self.readings = columns.ResourceArray(Reading, [
+            Reading(sensor="a", value=1.5, count=2, active=True, taken=self.taken),
+            Reading(sensor="b", value=-2.0, count=None, active=False, taken=None),
+        ])
+
+    def test_column_storage(self):
+        self.assertIsInstance(self.readings.columns['value'], columns.TypedColumn)
+        self.assertIsInstance(self.readings.columns['sensor'], columns.Column)
+        self.assertEqual('d', self.readings.columns['value'].values.typecode)
+        self.assertEqual([1.5, -2.0], self.readings.column('value'))
+        self.assertEqual([2, None], self.readings.column('count'))
+        self.assertEqual([True, False], self.readings.column('active'))
+        self.assertEqual([self.taken, None], self.readings.column('taken'))
+
+    def test_row_view(self):
+        self.assertEqual(2, len(self.readings))
+        row = self.readings[-1]
+        self.assertEqual("b", row.sensor)
+        self.assertEqual(Reading._meta, row._meta)
+
+        row.count = 5
+        row.value = 3.0
+        self.assertEqual([2, 5], self.readings.column('count'))
+        self.assertEqual(["a", "b"], [r.sensor for r in self.readings])
+        self.assertRaises(AttributeError, setattr, row, 'missing', 1)
+        self.assertRaises(IndexError, self.readings.__getitem__, 2)
+
+    def test_row_view_methods(self):
+        spans = columns.ResourceArray(Span, [Span(start=1, end=4)])
+        self.assertEqual(3, spans[0].duration())
+        self.assertEqual(3, spans[0].length)
+        self.assertEqual("s", spans[0].unit())
+        self.assertEqual("Span", spans[0].type_name())
+        self.assertRaises(AttributeError, getattr, spans[0], 'missing')
+
+    def test_to_resources(self):
+        actual = self.readings.to_resources()
+
+        self.assertEqual([Reading, Reading], [type(r) for r in actual])
+        self.assertEqual(self.taken, actual[0].taken)
+        self.assertIsNone(actual[1].count)
+
+    def test_encode(self):
+        self.assertEqual(jsrn.dumps(self.readings.to_resources()), jsrn.dumps(self.readings))
+
+    def test_append_wrong_type(self):
+        self.assertRaises(TypeError, self.readings.append, Span(start=1, end=2))
+
+    def test_overflow_uses_object_column(self):
+        self.readings.append(Reading(sensor="c", value=1.0, count=2 ** 70))
+
+        self.assertIsInstance(self.readings.columns['count'], columns.Column)
+        self.assertEqual([2, None, 2 ** 70], self.readings.column('count'))
+
+    def test_full_clean(self):
+        self.readings.append(Reading(sensor="c", value=151.0, count=-1))
+        self.readings.append(Reading(sensor="d", value=-51.0, count=1))
+        self.readings.append(Reading(sensor=None, value=None, count=1))
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            self.readings.full_clean()
+        self.assertEqual({
+            '2': {'value': ['Ensure this value is less than or equal to 150.'],
+                  'count': ['Ensure this value is greater than or equal to 0.']},
+            '3': {'value': ['Ensure this value is greater than or equal to -50.']},
+            '4': {'sensor': ['This field cannot be null.'], 'value': ['This field cannot be null.']},
+        }, cm.exception.message_dict)
+
+    def test_full_clean_resource(self):
+        spans = columns.ResourceArray(Span, [Span(start=1, end=4), Span(start=4, end=1)])
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            spans.full_clean()
+        self.assertEqual({'1': {'__all__': ['End before start.']}}, cm.exception.message_dict)
+
+    def test_full_clean_resource_super(self):
+        spans = columns.ResourceArray(NamedSpan, [NamedSpan(start=1, end=4, name="a"), NamedSpan(start=4, end=1),
+                                                  NamedSpan(start=1, end=2)])
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            spans.full_clean()
+        self.assertEqual({'1': {'__all__': ['End before start.']}, '2': {'__all__': ['Name required.']}},
+                         cm.exception.message_dict)
+
+    def test_full_clean_resource_error_dict(self):
+        ranges = columns.ResourceArray(Range, [Range(low=3, high=2), Range(low=1, high=2), Range(low=12, high=11)])
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            ranges.full_clean()
+        self.assertEqual({
+            '0': {'low': ["low must be <= high"]},
+            '2': {'low': ["low must be <= high"], 'high': ['Ensure this value is less than or equal to 10.']},
+        }, cm.exception.message_dict)
+
+    def test_from_dicts(self):
+        actual = columns.ResourceArray.from_dicts(Reading, [
+            {"$": "columns.Reading", "sensor": "a", "value": "1.5", "active": True,
+             "taken": "2013-07-13T16:54:46.123Z"},
+            {"sensor": "b", "value": 2},
+        ])
+
+        self.assertEqual([1.5, 2.0], actual.column('value'))
+        self.assertEqual([self.taken, None], actual.column('taken'))
+
+    def test_from_dicts_errors(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            columns.ResourceArray.from_dicts(Reading, [
+                {"sensor": "a", "value": "x"},
+                {"$": "columns.Span"},
+                {"sensor": "a", "value": 200},
+            ])
+        self.assertEqual(['0', '1'], sorted(cm.exception.message_dict))
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            columns.ResourceArray.from_dicts(Reading, [{"sensor": "a", "value": 1}, {"sensor": "a", "value": 200}])
+        self.assertEqual(['1'], list(cm.exception.message_dict))
+
+        actual = columns.ResourceArray.from_dicts(Reading, [{"sensor": "a", "value": 200}], trusted=True)
+        self.assertEqual([200.0], actual.column('value'))
+
+    @unittest.skipIf(get_numpy() is None, "NumPy is not installed")
+    def test_to_numpy(self):
+        actual = self.readings.to_numpy()
+
+        self.assertEqual([1.5, -2.0], actual['value'].tolist())
+        self.assertEqual([True, False], actual['active'].tolist())
+        self.assertEqual(["a", "b"], actual['sensor'].tolist())
+        self.assertTrue(get_numpy().isnat(actual['taken'][1]))
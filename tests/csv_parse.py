@@ -28,8 +28,23 @@ class CsvResourceReaderTestCase(unittest.TestCase):
         self.assertEqual(6, len(books))
         self.assertEqual("Consider Phlebas", books[0].title)
 
+    def test_valid_trusted(self):
+        with open(os.path.join(FIXTURE_PATH_ROOT, "libary-valid.csv")) as f:
+            books = [book for book in ResourceReader(f, Book, trusted=True)]
+
+        self.assertEqual(6, len(books))
+        self.assertEqual(471, books[0].num_pages)
+
     def test_invalid(self):
         with open(os.path.join(FIXTURE_PATH_ROOT, "libary-invalid.csv")) as f:
 
             with self.assertRaises(jsrn.exceptions.ValidationError):
                 books = [book for book in ResourceReader(f, Book)]
+
+    def test_invalid_with_only_valid_fields(self):
+        with open(os.path.join(FIXTURE_PATH_ROOT, "libary-invalid.csv")) as f:
+            books = [book for book in ResourceReader(f, Book, only=['title', 'author'])]
+
+        self.assertEqual(6, len(books))
+        self.assertEqual("Iain M. Banks", books[0].author)
+        self.assertIsNone(books[0].num_pages)
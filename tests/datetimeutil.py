@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
 import unittest
 import datetime
 from jsrn import datetimeutil
@@ -18,6 +21,73 @@ class ParseDateStringTestCase(unittest.TestCase):
             datetimeutil.parse_ecma_date_string("2013/07/13T16:54:46.123")
 
 
+class ParseDateStringsTestCase(unittest.TestCase):
+    def test_valid_strings(self):
+        actual = datetimeutil.parse_ecma_date_strings(["2013-07-13T16:54:46.123Z", "1970-01-01T00:00:00.000Z"], False)
+        self.assertEqual([
+            datetime.datetime(2013, 7, 13, 16, 54, 46, 123000, datetimeutil.utc),
+            datetimeutil.EPOCH,
+        ], actual)
+
+    def test_local_time(self):
+        actual = datetimeutil.parse_ecma_date_strings(["2013-07-13T16:54:46.123Z"])
+        self.assertEqual(datetime.datetime(2013, 7, 13, 16, 54, 46, 123000, datetimeutil.utc), actual[0])
+        self.assertIs(datetimeutil.local, actual[0].tzinfo)
+
+    def test_invalid_strings(self):
+        self.assertRaises(ValueError, datetimeutil.parse_ecma_date_strings, ["2013-07-13T16:54:46.123Z", None])
+        self.assertRaises(ValueError, datetimeutil.parse_ecma_date_strings, ["2013/07/13T16:54:46.123"])
+
+
+class EpochMillisecondsTestCase(unittest.TestCase):
+    def test_to_epoch_ms(self):
+        dt = datetime.datetime(2013, 7, 13, 16, 54, 46, 123000, datetimeutil.utc)
+        self.assertEqual(1373734486123, datetimeutil.to_epoch_ms(dt))
+        self.assertEqual(1373734486123, datetimeutil.to_epoch_ms(dt.replace(tzinfo=None), False))
+
+    def test_from_epoch_ms(self):
+        actual = datetimeutil.from_epoch_ms(1373734486123)
+        self.assertEqual(datetime.datetime(2013, 7, 13, 16, 54, 46, 123000, datetimeutil.utc), actual)
+        self.assertEqual(datetimeutil.EPOCH, datetimeutil.from_epoch_ms(0, False))
+
+
+class LocalTimezoneTestCase(unittest.TestCase):
+    def test_fromutc_matches_platform(self):
+        for stamp in (1373734486, 1356998400, 1382841000):
+            dt = datetime.datetime.fromtimestamp(stamp, datetimeutil.local)
+            self.assertEqual(datetime.datetime.fromtimestamp(stamp), dt.replace(tzinfo=None))
+
+    def test_dst_cached(self):
+        dt = datetime.datetime(2013, 7, 13, 16, 54)
+        expected = datetimeutil.local.dst(dt)
+        self.assertIn((2013, 7, 13, 16, 45), datetimeutil.LocalTimezone._dst_cache)
+        self.assertEqual(expected, datetimeutil.local.dst(dt.replace(minute=46)))
+
+    def test_half_hour_offset_transitions(self):
+        # Transitions in zones with half hour offsets occur on the half hour in UTC. Times just before the end of DST
+        # are not checked, the local time is ambiguous and is always treated as standard time.
+        code = ("import datetime, time\n"
+                "from jsrn import datetimeutil\n"
+                "for stamp in (%d, %d + 899):\n"
+                "    date_string = time.strftime('%%Y-%%m-%%dT%%H:%%M:%%S.000Z', time.gmtime(stamp))\n"
+                "    actual = datetimeutil.parse_ecma_date_string(date_string)\n"
+                "    assert datetimeutil.to_epoch_ms(actual) == stamp * 1000, (date_string, actual)\n"
+                "    expected = datetime.datetime.fromtimestamp(stamp)\n"
+                "    assert actual.replace(tzinfo=None) == expected, (date_string, actual)\n")
+        tests = (
+            ('Australia/Adelaide', '2013-04-06T16:30:00.000Z'),
+            ('Australia/Adelaide', '2013-10-05T16:30:00.000Z'),
+            ('America/St_Johns', '2013-11-03T04:30:00.000Z'),
+            ('America/St_Johns', '2013-03-10T05:30:00.000Z'),
+        )
+        for tz, date_string in tests:
+            if not os.path.exists(os.path.join('/usr/share/zoneinfo', tz)):
+                self.skipTest("Time zone data is not available.")
+            stamp = datetimeutil.to_epoch_ms(datetimeutil.parse_ecma_date_string(date_string)) // 1000
+            env = dict(os.environ, TZ=tz, PYTHONPATH=os.pathsep.join(sys.path))
+            subprocess.check_call([sys.executable, '-c', code % (stamp, stamp)], env=env)
+
+
 class ToDateStringTestCase(unittest.TestCase):
     def test_naive_datetime(self):
         dt = datetime.datetime(2013, 7, 13, 16, 54, 46, 123000)
@@ -24,3 +24,46 @@ class ValidationException(unittest.TestCase):
         target = exceptions.ValidationError(TEST_MESSAGE_DICT)
 
         self.assertDictEqual(TEST_MESSAGE_DICT, target.message_dict)
+
+
+class ValidationResultTestCase(unittest.TestCase):
+    def test_valid(self):
+        target = exceptions.ValidationResult("value", {})
+
+        self.assertTrue(target.is_valid)
+        target.raise_for_errors()
+
+    def test_invalid(self):
+        target = exceptions.ValidationResult(None, {'name': ["Required."]})
+
+        self.assertFalse(target.is_valid)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            target.raise_for_errors()
+        self.assertEqual({'name': ["Required."]}, cm.exception.message_dict)
+
+
+class FailFastErrorsTestCase(unittest.TestCase):
+    def test_raises_first_error(self):
+        target = exceptions.FailFastErrors().child('items').child('2')
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            target['name'] = ["Required."]
+        self.assertEqual(('items', '2', 'name'), cm.exception.path)
+        self.assertEqual({'items': {'2': {'name': ["Required."]}}}, cm.exception.message_dict)
+
+    def test_nested_errors_reduced_to_first(self):
+        target = exceptions.FailFastErrors()
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            target['owner'] = [{'name': ["Required."]}]
+        self.assertEqual(('owner', 'name'), cm.exception.path)
+
+    def test_update_empty(self):
+        target = exceptions.FailFastErrors()
+        target.update({})
+
+        self.assertFalse(target)
+
+    def test_child_errors(self):
+        self.assertEqual({}, exceptions.child_errors({}, 'a'))
+        self.assertEqual(('a', ), exceptions.child_errors(exceptions.FailFastErrors(), 'a').path)
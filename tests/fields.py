@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import array
 import unittest
 import datetime
-from jsrn import fields, datetimeutil
+from jsrn import fields, datetimeutil, validators
 from jsrn.exceptions import ValidationError
 from _fields_basic_helpers import create_simple_method
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class ObjectValue(object):
     pass
@@ -172,3 +178,175 @@ for idx, (field, value, expected) in enumerate(TO_PYTHON_TESTS):
     setattr(FieldToPythonTestCase, name, method)
 
 
+
+
+class ChoicesTestCase(unittest.TestCase):
+    def test_choice_values(self):
+        field = fields.StringField(choices=(('a', 'A'), ('b', 'B')))
+        self.assertEqual(frozenset(['a', 'b']), field.choice_values)
+
+        field.choices = (('c', 'C'), )
+        self.assertEqual(frozenset(['c']), field.choice_values)
+        self.assertRaises(ValidationError, field.clean, 'a')
+
+    def test_unhashable(self):
+        field = fields.ArrayField(choices=(([1], 'One'), ([2], 'Two')))
+        self.assertIsNone(field.choice_values)
+        self.assertEqual([1], field.clean([1]))
+        self.assertRaises(ValidationError, field.clean, [3])
+
+        field = fields.ObjectField(choices=(('a', 'A'), ))
+        self.assertRaises(ValidationError, field.clean, {'b': 1})
+
+
+class CompileCheckTestCase(unittest.TestCase):
+    def assertCheckEqual(self, field, value):
+        errors = {}
+        actual = field.compile_check()(value, errors, 'key')
+        try:
+            expected = field.clean(value)
+        except ValidationError as ve:
+            self.assertEqual({'key': ve.error_messages}, errors)
+            self.assertIsNone(actual)
+        else:
+            self.assertEqual({}, errors)
+            self.assertEqual(expected, actual)
+
+    def test_equivalent_to_clean(self):
+        tests = [
+            (fields.StringField(), ["a", None, fields.NOT_PROVIDED]),
+            (fields.StringField(null=True, max_length=2, validators=[validators.MinLengthValidator(2)]),
+             ["a", "abc", "ab", None, ""]),
+            (fields.StringField(choices=(('a', 'A'), ), null=True), ["a", "b", "", None]),
+            (fields.StringField(max_length=2, error_messages={'max_length': 'Too long!'}), ["abc"]),
+            (fields.IntegerField(min_value=1, max_value=5, null=True), [1, "3", 0, 6, "x", None]),
+            (fields.IntegerField(use_default_if_not_provided=True, default=3), [fields.NOT_PROVIDED]),
+            (fields.TypedArrayField(fields.IntegerField(max_value=1)), [[1], [2], None]),
+            (fields.DateTimeField(assume_local=False), [DATE_TIME_STRING, DATE_TIME_STRING_INVALID]),
+        ]
+        for field, values in tests:
+            for value in values:
+                self.assertCheckEqual(field, value)
+
+    def test_all_validator_messages(self):
+        field = fields.StringField(max_length=2, validators=[validators.MinLengthValidator(4)])
+        errors = {}
+
+        self.assertIsNone(field.compile_check()("abc", errors, 'key'))
+        self.assertEqual(2, len(errors['key']))
+
+
+class DateTimeFieldTestCase(unittest.TestCase):
+    def test_to_json(self):
+        field = fields.DateTimeField(assume_local=False)
+        self.assertEqual(DATE_TIME_STRING, field.to_json(DATE_TIME_AWARE))
+        self.assertEqual(DATE_TIME_STRING, field.to_json(DATE_TIME_NAIVE))
+        self.assertIsNone(field.to_json(None))
+
+    def test_epoch_ms(self):
+        field = fields.DateTimeField(assume_local=False, epoch_ms=True)
+        self.assertEqual(1373734486123, field.to_json(DATE_TIME_AWARE))
+        self.assertEqual(DATE_TIME_AWARE, field.to_python(1373734486123))
+        self.assertEqual(DATE_TIME_AWARE, field.to_python(DATE_TIME_STRING))
+        self.assertRaises(ValidationError, field.to_python, True)
+
+    def test_typed_array_batch(self):
+        field = fields.TypedArrayField(fields.DateTimeField(assume_local=False))
+        self.assertEqual([DATE_TIME_AWARE, DATE_TIME_AWARE], field.clean([DATE_TIME_STRING, DATE_TIME_STRING]))
+
+        with self.assertRaises(ValidationError) as cm:
+            field.clean([DATE_TIME_STRING, DATE_TIME_STRING_INVALID])
+        self.assertEqual([1], list(cm.exception.message_dict))
+
+
+class TypedArrayFieldTestCase(unittest.TestCase):
+    def test_validates_items(self):
+        field = fields.TypedArrayField(fields.IntegerField(min_value=0))
+
+        self.assertEqual([1, 2], field.clean([1, "2"]))
+        with self.assertRaises(ValidationError) as cm:
+            field.clean([1, -1, None])
+        self.assertEqual([1, 2], sorted(cm.exception.message_dict))
+
+    def test_null_items(self):
+        field = fields.TypedArrayField(fields.StringField())
+
+        with self.assertRaises(ValidationError) as cm:
+            field.clean(['a', None])
+        self.assertEqual({1: ['This field cannot be null.']}, cm.exception.message_dict)
+        self.assertEqual(['a', None], fields.TypedArrayField(fields.StringField(null=True)).clean(['a', None]))
+
+    def test_overridden_item_validate(self):
+        class EvenField(fields.IntegerField):
+            def validate(self, value):
+                super(EvenField, self).validate(value)
+                if value % 2:
+                    raise ValidationError("Must be even.")
+
+        with self.assertRaises(ValidationError) as cm:
+            fields.TypedArrayField(EvenField()).clean([2, 3])
+        self.assertEqual({1: ["Must be even."]}, cm.exception.message_dict)
+
+    def test_array_storage(self):
+        field = fields.TypedArrayField(fields.FloatField(), storage='array')
+
+        actual = field.clean([1, 2.5, "3"])
+
+        self.assertEqual(array.array('d', [1.0, 2.5, 3.0]), actual)
+        self.assertEqual([1.0, 2.5, 3.0], field.to_json(actual))
+
+    def test_array_storage_conversion_errors(self):
+        field = fields.TypedArrayField(fields.IntegerField(), storage='array')
+
+        self.assertEqual(array.array('q', [1, 2]), field.to_python([1.5, "2"]))
+        with self.assertRaises(ValidationError) as cm:
+            field.to_python([1, "fudge", None, 2 ** 70])
+        self.assertEqual({
+            1: ["'fudge' value must be a integer."],
+            2: ['This field cannot be null.'],
+            3: ['Value cannot be stored in a typed array.'],
+        }, cm.exception.message_dict)
+
+    def test_array_storage_limits(self):
+        field = fields.TypedArrayField(fields.IntegerField(min_value=0, max_value=10), storage='array')
+
+        field.clean([0, 5, 10])
+        with self.assertRaises(ValidationError) as cm:
+            field.clean([0, 11, 5, -1])
+        self.assertEqual({
+            1: ['Ensure this value is less than or equal to 10.'],
+            3: ['Ensure this value is greater than or equal to 0.'],
+        }, cm.exception.message_dict)
+
+    def test_invalid_storage(self):
+        self.assertRaises(TypeError, fields.TypedArrayField, fields.StringField(), storage='array')
+        self.assertRaises(ValueError, fields.TypedArrayField, fields.IntegerField(), storage='tuple')
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy_storage(self):
+        field = fields.TypedArrayField(fields.FloatField(max_value=1), storage='numpy')
+
+        actual = field.clean([0.5, 1])
+        self.assertIsInstance(actual, numpy.ndarray)
+        self.assertEqual([0.5, 1.0], field.to_json(actual))
+        self.assertIs(actual, field.clean(actual))
+
+        with self.assertRaises(ValidationError) as cm:
+            field.clean(numpy.array([0.5, 2, 3]))
+        self.assertEqual([1, 2], sorted(cm.exception.message_dict))
+
+
+class ErrorMessagesTestCase(unittest.TestCase):
+    def test_default_error_messages_merged(self):
+        messages = fields.IntegerField.get_default_error_messages()
+
+        self.assertIs(messages, fields.IntegerField.get_default_error_messages())
+        self.assertIn('null', messages)
+        self.assertIn('invalid', messages)
+        self.assertIsNot(messages, fields.Field.get_default_error_messages())
+
+    def test_overridden_error_messages(self):
+        field = fields.IntegerField(error_messages={'null': "Required!"})
+
+        self.assertEqual("Required!", field.error_messages['null'])
+        self.assertEqual('This field cannot be null.', fields.IntegerField().error_messages['null'])
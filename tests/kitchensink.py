@@ -81,3 +81,37 @@ class KitchenSinkTestCase(unittest.TestCase):
     def test_load_invalid_data(self):
         with self.assertRaises(exceptions.ValidationError):
             jsrn.load(open(os.path.join(FIXTURE_PATH_ROOT, "book-invalid.json")))
+
+    def test_validate_valid_data(self):
+        with open(os.path.join(FIXTURE_PATH_ROOT, "book-valid.json")) as fp:
+            result = jsrn.validate(fp.read())
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual({}, result.errors)
+        self.assertEqual("Consider Phlebas", result.value.books[0].title)
+
+    def test_validate_invalid_data(self):
+        with open(os.path.join(FIXTURE_PATH_ROOT, "book-invalid.json")) as fp:
+            data = fp.read()
+
+        result = jsrn.validate(data)
+
+        self.assertFalse(result.is_valid)
+        self.assertIsNone(result.value)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.loads(data)
+        self.assertEqual(cm.exception.message_dict, result.errors)
+        self.assertEqual(['1', '2'], sorted(result.errors['books']['0']['authors']))
+        self.assertRaises(exceptions.ValidationError, result.raise_for_errors)
+
+    def test_validate_does_not_defer(self):
+        result = jsrn.validate('{"$": "library.Book", "num_pages": "x"}')
+
+        self.assertFalse(result.is_valid)
+        self.assertIn('num_pages', result.errors)
+        self.assertRaises(TypeError, jsrn.validate, '{}', Book, lazy=True)
+
+    def test_validate_list(self):
+        result = jsrn.validate('[{"name": "a"}, {"$": "Unknown"}, {"name": 1}]', Author)
+
+        self.assertEqual({'1': {'__all__': ["Resource `Unknown` is not registered."]}}, result.errors)
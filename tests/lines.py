@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+import jsrn
+from jsrn import exceptions
+
+
+class Event(jsrn.Resource):
+    class Meta:
+        name_space = "lines"
+
+    name = jsrn.StringField()
+
+
+class ClickEvent(Event):
+    class Meta:
+        name_space = "lines"
+
+    x = jsrn.IntegerField()
+
+
+class JsonLinesTestCase(unittest.TestCase):
+    def test_dump_lines(self):
+        fp = io.StringIO()
+
+        jsrn.dump_lines(iter([Event(name="a"), ClickEvent(name="b", x=1)]), fp)
+
+        lines = fp.getvalue().split('\n')
+        self.assertEqual(3, len(lines))
+        self.assertEqual('', lines[2])
+        self.assertEqual("lines.ClickEvent", jsrn.loads(lines[1]).__class__._meta.resource_name)
+
+    def test_round_trip_polymorphic(self):
+        fp = io.StringIO()
+        jsrn.dump_lines([Event(name="a"), ClickEvent(name="b", x=1)], fp)
+        fp.seek(0)
+
+        actual = list(jsrn.load_lines(fp, Event))
+
+        self.assertEqual([Event, ClickEvent], [type(r) for r in actual])
+        self.assertEqual(1, actual[1].x)
+
+    def test_load_lines_default_resource(self):
+        fp = io.StringIO(u'{"name": "a"}\n\n{"name": "b"}\n')
+
+        actual = list(jsrn.load_lines(fp, Event))
+
+        self.assertEqual(["a", "b"], [r.name for r in actual])
+
+    def test_load_lines_validation_error(self):
+        fp = io.StringIO(u'{"name": "a"}\n\n{"$": "lines.ClickEvent", "name": "b", "x": "y"}\n')
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            list(jsrn.load_lines(fp, Event))
+        self.assertEqual(["3"], list(cm.exception.message_dict))
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import multiprocessing
+import unittest
+import jsrn
+from jsrn import exceptions, parallel
+
+
+class Measurement(jsrn.Resource):
+    class Meta:
+        name_space = "parallel"
+
+    name = jsrn.StringField()
+    value = jsrn.IntegerField(min_value=0)
+
+
+def make_document(count, invalid=()):
+    return json.dumps([{"name": "m%d" % i, "value": -1 if i in invalid else i} for i in range(count)])
+
+
+class LoadsParallelTestCase(unittest.TestCase):
+    def test_loads_parallel_ordered(self):
+        actual = jsrn.loads_parallel(make_document(100), Measurement, chunk_size=7, workers=2)
+
+        self.assertEqual(list(range(100)), [m.value for m in actual])
+        self.assertIsInstance(actual[0], Measurement)
+
+    def test_loads_parallel_errors_by_index(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.loads_parallel(make_document(50, invalid=(3, 42)), Measurement, chunk_size=10, workers=2)
+
+        self.assertEqual(["3", "42"], sorted(cm.exception.message_dict))
+
+    def test_loads_parallel_single_chunk(self):
+        actual = jsrn.loads_parallel(make_document(5), Measurement)
+
+        self.assertEqual(5, len(actual))
+
+    def test_loads_parallel_single_resource(self):
+        actual = jsrn.loads_parallel('{"$": "parallel.Measurement", "name": "a", "value": 1}')
+
+        self.assertEqual("a", actual.name)
+
+    def test_load_parallel_lines(self):
+        fp = io.StringIO(u'{"name": "a", "value": 1}\n\n{"name": "b", "value": -1}\n{"name": "c", "value": 3}\n')
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            jsrn.load_parallel(fp, Measurement, lines=True, chunk_size=1, workers=2)
+        self.assertEqual(["3"], list(cm.exception.message_dict))
+
+    def test_loads_parallel_lines_trusted(self):
+        s = '\n'.join('{"name": "m%d", "value": %d}' % (i, -i) for i in range(20))
+
+        actual = jsrn.loads_parallel(s, Measurement, lines=True, trusted=True, chunk_size=5, workers=2)
+
+        self.assertEqual([-i for i in range(20)], [m.value for m in actual])
+
+    def test_decode_items_iterator(self):
+        items = ((str(i), '{"name": "m%d", "value": %d}' % (i, i)) for i in range(30))
+        pool = multiprocessing.Pool(2)
+        try:
+            actual = parallel.decode_items(items, True, "parallel.Measurement", chunk_size=4, pool=pool)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.assertEqual(list(range(30)), [m.value for m in actual])
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+import copy
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+import jsrn
+
+
+class Point(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+        slots = True
+
+    x = jsrn.IntegerField()
+    y = jsrn.IntegerField()
+
+
+class PlainPoint(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+
+    x = jsrn.IntegerField()
+    y = jsrn.IntegerField()
+
+
+class AbstractShape(jsrn.Resource):
+    class Meta:
+        abstract = True
+        slots = True
+
+    colour = jsrn.StringField()
+
+
+class Circle(AbstractShape):
+    class Meta:
+        name_space = "resources"
+
+    origin = jsrn.ObjectAs(Point)
+    radius = jsrn.FloatField()
+
+
+class TaggedPoint(Point):
+    __slots__ = ('extra',)
+
+    label = jsrn.StringField()
+
+    def extra_attrs(self, attrs):
+        self.extra = attrs
+
+
+class SlotsTestCase(unittest.TestCase):
+    def test_no_instance_dict(self):
+        self.assertTrue(Point._meta.slots)
+        self.assertFalse(hasattr(Point(x=1, y=2), '__dict__'))
+        self.assertTrue(hasattr(PlainPoint(x=1, y=2), '__dict__'))
+
+    def test_instance_is_smaller(self):
+        point = Point(x=1, y=2)
+        plain_point = PlainPoint(x=1, y=2)
+
+        plain_size = sys.getsizeof(plain_point) + sys.getsizeof(plain_point.__dict__)
+        self.assertLess(sys.getsizeof(point), plain_size * 0.6)
+
+    def test_slots_inherited(self):
+        circle = jsrn.loads('{"$": "resources.Circle", "colour": "red", "origin": {"x": 1, "y": 2}, "radius": 3}')
+
+        self.assertTrue(Circle._meta.slots)
+        self.assertFalse(hasattr(circle, '__dict__'))
+        self.assertEqual("red", circle.colour)
+        self.assertEqual(2, circle.origin.y)
+
+    def test_value_from_object(self):
+        point = Point(x=1, y=2)
+
+        self.assertEqual([1, 2], [f.value_from_object(point) for f in Point._meta.fields])
+
+    def test_extra_attrs_with_declared_slot(self):
+        point = jsrn.loads('{"$": "resources.TaggedPoint", "x": 1, "y": 2, "label": "a", "z": 3}')
+
+        self.assertFalse(hasattr(point, '__dict__'))
+        self.assertDictEqual({"z": 3}, point.extra)
+
+    def test_dumps(self):
+        point = jsrn.loads(jsrn.dumps(Point(x=1, y=2)))
+
+        self.assertEqual((1, 2), (point.x, point.y))
+
+
+class Header(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+
+    key = jsrn.StringField()
+    value = jsrn.StringField()
+
+
+class Message(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+
+    id = jsrn.IntegerField()
+    subject = jsrn.StringField(max_length=10)
+    headers = jsrn.ArrayOf(Header)
+
+    def clean(self):
+        if self.subject == "invalid":
+            raise jsrn.exceptions.ValidationError("Invalid message.")
+
+
+class LazyResourceTestCase(unittest.TestCase):
+    def test_fields_cleaned_on_access(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": "1", "subject": "%s", '
+                             '"headers": [{"key": "a", "value": "b"}]}' % ("x" * 11), lazy=True)
+
+        self.assertIsInstance(message, Message)
+        self.assertEqual(1, message.id)
+        self.assertEqual("a", message.headers[0].key)
+        self.assertEqual(["subject"], list(message._lazy_fields))
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.subject
+        self.assertIn("subject", cm.exception.message_dict)
+
+    def test_full_clean_forces_fields(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": "x", "subject": "invalid"}', lazy=True)
+
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.full_clean()
+        self.assertEqual(["__all__", "id"], sorted(cm.exception.message_dict))
+
+    def test_full_clean_valid(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "hello"}', lazy=True)
+
+        message.full_clean()
+        self.assertFalse(message._lazy_fields)
+        self.assertEqual([], message.headers)
+
+    def test_assigned_before_access(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "orig"}', lazy=True)
+
+        message.subject = "changed"
+        message.full_clean()
+        self.assertEqual("changed", message.subject)
+        self.assertFalse(message._lazy_fields)
+
+    def test_assigned_before_access_is_cleaned(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "orig"}', lazy=True)
+
+        message.subject = "x" * 11
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.full_clean()
+        self.assertEqual(["subject"], list(cm.exception.message_dict))
+
+    def test_missing_attribute(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1}', lazy=True)
+
+        self.assertFalse(hasattr(message, "other"))
+
+    def test_dumps(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "hello"}', lazy=True)
+
+        actual = jsrn.loads(jsrn.dumps(message))
+        self.assertEqual("hello", actual.subject)
+
+    def test_slots_loaded_eagerly(self):
+        point = jsrn.loads('{"$": "resources.Point", "x": 1, "y": 2}', lazy=True)
+
+        self.assertEqual(1, point.x)
+        self.assertIsNone(point._lazy_fields)
+
+
+class PlainObjectPoint(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class PickleTestCase(unittest.TestCase):
+    def assertRoundTrip(self, resource):
+        actual = pickle.loads(pickle.dumps(resource, pickle.HIGHEST_PROTOCOL))
+        self.assertIs(type(resource), type(actual))
+        for f in resource._meta.fields:
+            self.assertEqual(getattr(resource, f.attname), getattr(actual, f.attname))
+        return actual
+
+    def test_round_trip(self):
+        self.assertRoundTrip(PlainPoint(x=1, y=2))
+        self.assertRoundTrip(Point(x=1, y=2))
+
+    def test_nested(self):
+        circle = Circle(colour="red", origin=Point(x=1, y=2), radius=1.5)
+
+        actual = pickle.loads(pickle.dumps(circle))
+        self.assertEqual(2, actual.origin.y)
+
+    def test_not_validated(self):
+        message = Message(id="not an id", subject="x" * 20)
+
+        actual = self.assertRoundTrip(message)
+        self.assertEqual("not an id", actual.id)
+
+    def test_extra_state(self):
+        point = TaggedPoint(x=1, y=2, label="a")
+        point.extra = {"z": 3}
+        plain_point = PlainPoint(x=1, y=2)
+        plain_point.note = "b"
+
+        self.assertEqual({"z": 3}, self.assertRoundTrip(point).extra)
+        self.assertEqual("b", self.assertRoundTrip(plain_point).note)
+        self.assertFalse(hasattr(self.assertRoundTrip(TaggedPoint(x=1, y=2)), "extra"))
+
+    def test_lazy(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "hello"}', lazy=True)
+
+        actual = self.assertRoundTrip(message)
+        self.assertIsNone(actual._lazy_fields)
+
+    def test_compact(self):
+        points = [PlainPoint(x=i, y=i) for i in range(100)]
+        objects = [PlainObjectPoint(x=i, y=i) for i in range(100)]
+
+        self.assertLess(len(pickle.dumps(points, 2)), len(pickle.dumps(objects, 2)))
+
+    def test_copy(self):
+        circle = Circle(colour="red", origin=Point(x=1, y=2), radius=1.5)
+
+        actual = copy.deepcopy(circle)
+        self.assertIsNot(circle.origin, actual.origin)
+        self.assertEqual(2, actual.origin.y)
+
+
+class FailFastTestCase(unittest.TestCase):
+    def test_loads(self):
+        data = ('{"$": "resources.Message", "id": 1, "subject": "hello", "headers": ['
+                '{"key": "a", "value": "b"}, {"key": "a"}, {"key": "b"}]}')
+
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.loads(data, fail_fast=True)
+        self.assertEqual(('headers', '1', 'value'), cm.exception.path)
+        self.assertEqual({'headers': {'1': {'value': ["This field cannot be null."]}}}, cm.exception.message_dict)
+
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.loads(data)
+        self.assertEqual(['1', '2'], sorted(cm.exception.message_dict['headers']))
+
+    def test_stops_at_first_error(self):
+        items = ','.join('{"key": null, "value": "b"}' for _ in range(10))
+        data = '[%s]' % ','.join('{"$": "resources.Message", "id": 1, "subject": "a", "headers": [%s]}' % items
+                                 for _ in range(10))
+        decoded = []
+        decoder = Header._meta.decoder
+
+        def counting_decoder(obj, errors=None):
+            decoded.append(obj)
+            return decoder(obj, errors)
+        Header._meta._decoder = counting_decoder
+        try:
+            with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+                jsrn.loads(data, fail_fast=True)
+        finally:
+            del Header._meta._decoder
+        self.assertEqual(('0', 'headers', '0', 'key'), cm.exception.path)
+        self.assertEqual(1, len(decoded))
+
+    def test_loads_resource_level_error(self):
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "invalid"}', fail_fast=True)
+        self.assertEqual(('__all__', ), cm.exception.path)
+
+    def test_loads_unknown_resource(self):
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.loads('[{"$": "resources.Message", "id": 1, "subject": "a"}, {"$": "resources.Unknown"}]',
+                       fail_fast=True)
+        self.assertEqual(('1', '__all__'), cm.exception.path)
+
+    def test_valid(self):
+        message = jsrn.loads('{"$": "resources.Message", "id": 1, "subject": "hello"}', fail_fast=True)
+
+        self.assertEqual("hello", message.subject)
+
+    def test_create_resource_from_dict(self):
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            jsrn.resources.create_resource_from_dict(
+                {"id": "x", "subject": "x" * 11}, "resources.Message", fail_fast=True)
+        self.assertEqual(('id', ), cm.exception.path)
+
+    def test_full_clean(self):
+        message = Message(id=1, subject="x" * 11, headers=[Header(key="a"), Header()])
+
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.full_clean(fail_fast=True)
+        self.assertEqual(('subject', ), cm.exception.path)
+
+        message.subject = "a"
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.full_clean(fail_fast=True)
+        self.assertEqual(('headers', '0', 'value'), cm.exception.path)
+
+        message.headers = []
+        message.subject = "invalid"
+        with self.assertRaises(jsrn.exceptions.ValidationError) as cm:
+            message.full_clean(fail_fast=True)
+        self.assertEqual({'__all__': ["Invalid message."]}, cm.exception.message_dict)
+
+
+class Vehicle(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+
+    wheels = jsrn.IntegerField()
+
+
+class Car(Vehicle):
+    class Meta:
+        name_space = "resources"
+
+
+class SportsCar(Car):
+    class Meta:
+        name_space = "resources"
+
+    top_speed = jsrn.IntegerField(null=True)
+
+
+class Garage(jsrn.Resource):
+    class Meta:
+        name_space = "resources"
+
+    vehicles = jsrn.ArrayOf(Vehicle)
+
+
+class ResolutionTestCase(unittest.TestCase):
+    def test_ancestor_names(self):
+        self.assertEqual(frozenset(["resources.SportsCar", "resources.Car", "resources.Vehicle"]),
+                         jsrn.registration.get_ancestor_names(SportsCar))
+        self.assertTrue(jsrn.registration.is_sub_resource(SportsCar, "resources.Vehicle"))
+        self.assertFalse(jsrn.registration.is_sub_resource(Vehicle, "resources.Car"))
+
+    def test_get_resource(self):
+        self.assertIs(SportsCar, jsrn.registration.get_resource("resources.sportscar"))
+        self.assertIs(SportsCar, jsrn.registration.get_resource("resources.SportsCar"))
+        self.assertIn("resources.sportscar", jsrn.registration.cache.resolved)
+        self.assertIsNone(jsrn.registration.get_resource("resources.Unknown"))
+        self.assertNotIn("resources.Unknown", jsrn.registration.cache.resolved)
+
+    def test_grandchild_resource(self):
+        garage = jsrn.loads('{"$": "resources.Garage", "vehicles": [{"$": "resources.Car", "wheels": 4}, '
+                            '{"$": "resources.SportsCar", "wheels": 4, "top_speed": 300}]}')
+
+        self.assertEqual([Car, SportsCar], [type(v) for v in garage.vehicles])
+        self.assertIsInstance(jsrn.loads('{"$": "resources.SportsCar", "wheels": 4}', Vehicle), SportsCar)
+
+    def test_unrelated_resource(self):
+        self.assertRaises(jsrn.exceptions.ValidationError, jsrn.loads, '{"$": "resources.Vehicle", "wheels": 4}',
+                          SportsCar)
+
+
+class ClassCreationTestCase(unittest.TestCase):
+    def test_parent_fields_share_state(self):
+        parent_field = Vehicle._meta.fields[0]
+        field = [f for f in SportsCar._meta.fields if f.attname == 'wheels'][0]
+
+        self.assertIsNot(parent_field, field)
+        self.assertIs(Vehicle, parent_field.model)
+        self.assertIs(SportsCar, field.model)
+        self.assertIs(parent_field.validators, field.validators)
+        self.assertIs(parent_field.error_messages, field.error_messages)
+
+    def test_add_field_clears_compiled_state(self):
+        class Temporary(jsrn.Resource):
+            class Meta:
+                name_space = "resources.class_creation"
+
+            name = jsrn.StringField()
+
+        Temporary._meta.decoder
+        self.assertIn('_decoder', Temporary._meta.__dict__)
+        Temporary.add_to_class('other', jsrn.StringField(null=True))
+        self.assertNotIn('_decoder', Temporary._meta.__dict__)
+        self.assertEqual("b", jsrn.loads('{"name": "a", "other": "b"}', Temporary).other)
+
+    def test_import_time(self):
+        # NumPy is slow to import and is only imported when first required.
+        code = ("import sys, time; t = time.time(); import jsrn; "
+                "print('%d %f' % ('numpy' in sys.modules, time.time() - t))")
+        output = subprocess.check_output([sys.executable, '-c', code], env=dict(
+            os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        numpy_imported, import_time = output.split()
+
+        self.assertEqual(b'0', numpy_imported)
+        self.assertLess(float(import_time), 1.0)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+import jsrn
+from jsrn import exceptions, streaming
+
+
+class Reading(jsrn.Resource):
+    class Meta:
+        name_space = "streaming"
+
+    sensor = jsrn.StringField()
+    value = jsrn.IntegerField(max_value=100)
+
+
+class Export(jsrn.Resource):
+    class Meta:
+        name_space = "streaming"
+
+    name = jsrn.StringField()
+    readings = jsrn.ArrayOf(Reading)
+
+
+READINGS = ('[{"$": "streaming.Reading", "sensor": "café", "value": 12345678},'
+            ' {"sensor": "b", "value": 2}, {"sensor": "c", "value": 3}]')
+
+
+class IterArrayTestCase(unittest.TestCase):
+    def test_root_array(self):
+        actual = list(streaming.iter_array(io.StringIO(u'[1, 22, {"a": [1, 2]}, "x", 333]'), chunk_size=3))
+
+        self.assertEqual([1, 22, {"a": [1, 2]}, "x", 333], actual)
+
+    def test_empty_array(self):
+        self.assertEqual([], list(streaming.iter_array(io.StringIO(u' [ ] '))))
+
+    def test_bytes_split_characters(self):
+        actual = list(streaming.iter_array(io.BytesIO(u'["café", "☃"]'.encode('utf-8')), chunk_size=1))
+
+        self.assertEqual([u"café", u"☃"], actual)
+
+    def test_path(self):
+        fp = io.StringIO(u'{"a": {"skip": [1, {"b": 2}], "b": [4, 5]}, "c": 1}')
+
+        self.assertEqual([4, 5], list(streaming.iter_array(fp, ["a", "b"], chunk_size=4)))
+
+    def test_path_not_found(self):
+        with self.assertRaises(ValueError):
+            list(streaming.iter_array(io.StringIO(u'{"a": 1}'), ["b"]))
+
+    def test_invalid_document(self):
+        with self.assertRaises(ValueError):
+            list(streaming.iter_array(io.StringIO(u'[1, 2 3]')))
+
+        with self.assertRaises(ValueError):
+            list(streaming.iter_array(io.StringIO(u'[1, {"a": ')))
+
+    def test_invalid_element_not_buffered(self):
+        fp = io.StringIO(u'[{"a": 1}, {"a": x}, ' + u', '.join([u'{"a": "%s"}' % (u"y" * 100)] * 10000) + u']')
+
+        with self.assertRaises(ValueError):
+            list(streaming.iter_array(fp, chunk_size=64))
+        self.assertLess(fp.tell(), 1000)
+
+    def test_split_values(self):
+        document = u'[true, -1.5e10, "\\u2603 long string", {"a": null}, "\\""]'
+
+        for chunk_size in range(1, len(document) + 1):
+            actual = list(streaming.iter_array(io.StringIO(document), chunk_size=chunk_size))
+            self.assertEqual([True, -1.5e10, u"\u2603 long string", {"a": None}, u'"'], actual)
+
+
+class IterLoadTestCase(unittest.TestCase):
+    def test_iterload(self):
+        actual = jsrn.iterload(io.StringIO(READINGS.replace("12345678", "1")), Reading, chunk_size=16)
+
+        self.assertEqual([u"café", "b", "c"], [r.sensor for r in actual])
+
+    def test_iterload_validation_error(self):
+        actual = jsrn.iterload(io.StringIO(READINGS), Reading)
+
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            next(actual)
+        self.assertEqual(["0"], list(cm.exception.message_dict))
+
+    def test_iterload_resource_path(self):
+        fp = io.StringIO(u'{"$": "streaming.Export", "name": "x", "readings": %s}' % READINGS)
+
+        actual = jsrn.iterload(fp, Export, path="readings", only=["sensor"])
+
+        self.assertEqual([u"café", "b", "c"], [r.sensor for r in actual])
+
+    def test_iterload_resource_path_not_array(self):
+        with self.assertRaises(TypeError):
+            list(jsrn.iterload(io.StringIO(u'{}'), Export, path="name"))
+
+
+class ResourceWriterTestCase(unittest.TestCase):
+    def test_dump_iter_generator(self):
+        fp = io.StringIO()
+
+        jsrn.dump_iter((Reading(sensor="s%d" % i, value=i) for i in range(50)), fp)
+
+        actual = jsrn.loads(fp.getvalue())
+        self.assertEqual(list(range(50)), [r.value for r in actual])
+
+    def test_dump_iter_pretty_print(self):
+        fp = io.StringIO()
+
+        jsrn.dump_iter([Reading(sensor="a", value=1), Reading(sensor="b", value=2)], fp, pretty_print=True)
+
+        actual = fp.getvalue()
+        self.assertTrue(actual.startswith('[\n    {\n        '))
+        self.assertTrue(actual.endswith('\n    }\n]'))
+        self.assertEqual(["a", "b"], [r.sensor for r in jsrn.loads(actual)])
+
+    def test_dump_iter_empty(self):
+        for pretty_print in (False, True):
+            fp = io.StringIO()
+            jsrn.dump_iter(iter([]), fp, pretty_print)
+            self.assertEqual('[]', fp.getvalue())
+
+    def test_buffered_writes(self):
+        fp = io.StringIO()
+
+        with streaming.ResourceWriter(fp, buffer_size=1024) as writer:
+            writer.write(Reading(sensor="a", value=1))
+            self.assertEqual('', fp.getvalue())
+            for i in range(100):
+                writer.write(Reading(sensor="b", value=i))
+            self.assertNotEqual('', fp.getvalue())
+
+        self.assertEqual(101, len(jsrn.loads(fp.getvalue())))
+
+    def test_exception_does_not_terminate_array(self):
+        fp = io.StringIO()
+
+        with self.assertRaises(RuntimeError):
+            with streaming.ResourceWriter(fp) as writer:
+                writer.write(Reading(sensor="a", value=1))
+                raise RuntimeError()
+
+        self.assertTrue(fp.getvalue().startswith('[{'))
+        self.assertFalse(fp.getvalue().endswith(']'))
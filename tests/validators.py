@@ -27,6 +27,29 @@ VALIDATOR_TESTS = [
 class ValidatorTestCase(unittest.TestCase):
     pass
 
+
+class CompileValidatorTestCase(unittest.TestCase):
+    def test_limit_validator(self):
+        check = validators.compile_validator(validators.MaxValueValidator(10))
+
+        self.assertIsNone(check(10))
+        self.assertEqual(['Ensure this value is less than or equal to 10.'], check(11))
+
+    def test_error_messages(self):
+        check = validators.compile_validator(validators.MaxLengthValidator(2), {
+            'max_length': "At most %(limit_value)d (not %(show_value)d)."})
+
+        self.assertEqual(['At most 2 (not 3).'], check("abc"))
+
+    def test_other_validator(self):
+        def validator(value):
+            if value:
+                raise ValidationError("Must be false.", code='true')
+        check = validators.compile_validator(validator, {'true': "Not false!"})
+
+        self.assertIsNone(check(False))
+        self.assertEqual(["Not false!"], check(True))
+
 for idx, (field, value, expected) in enumerate(VALIDATOR_TESTS):
     name, method = create_simple_method(field, None, value, expected, idx)
     setattr(ValidatorTestCase, name, method)